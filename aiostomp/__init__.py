@@ -2,5 +2,8 @@
 __version__ = "1.6.2"
 
 from .aiostomp import AioStomp
+from .publisher import WindowedPublisher
+from .transaction import Transaction, BatchingPublisher
+from .pipeline import Pipeline
 
-__all__ = ["AioStomp"]
+__all__ = ["AioStomp", "WindowedPublisher", "Transaction", "BatchingPublisher", "Pipeline"]
@@ -0,0 +1,136 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from collections import OrderedDict
+
+
+class AckCoalescer:
+    """Holds ACK frames back and sends them together.
+
+    For `client` subscriptions an ACK acknowledges every message delivered
+    before it, so only the last message of a run of handled messages is
+    acked. Messages are tracked in delivery order and a message is only
+    covered once everything delivered before it was handled too.
+
+    For `client-individual` subscriptions the ACK frames are kept as they
+    are and written together.
+
+    Pending acks are sent once `max_pending` of them are waiting or
+    `flush_interval` seconds after the first one, whichever comes first.
+    NACKs are never delayed: pending acks are flushed and the NACK is
+    sent right away.
+    """
+
+    def __init__(
+        self,
+        send_frame: Callable[[str, Dict[str, Any]], None],
+        loop: asyncio.AbstractEventLoop,
+        flush_interval: float = 0.1,
+        max_pending: int = 100,
+        stats: Any = None,
+    ):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self.pending_acks = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+
+        self._send_frame = send_frame
+        self._loop = loop
+        self._stats = stats
+
+        # subscription -> message-id -> handled, in delivery order
+        self._delivered: Dict[str, OrderedDict] = {}
+        # subscription -> last message-id a cumulative ack covers
+        self._cumulative: Dict[str, str] = {}
+        self._individual: List[Tuple[str, str]] = []
+
+        self._first_pending_at = 0.0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def delivered(self, subscription: str, message_id: str) -> None:
+        self._delivered.setdefault(subscription, OrderedDict())[message_id] = False
+
+    def ack(self, subscription: str, message_id: str) -> None:
+        if self._stats:
+            self._stats.increment("acked")
+
+        delivered = self._delivered.get(subscription)
+
+        if delivered is not None and message_id in delivered:
+            delivered[message_id] = True
+
+            # Move the ack point over every handled message at the front
+            while delivered:
+                head, handled = next(iter(delivered.items()))
+                if not handled:
+                    break
+
+                delivered.popitem(last=False)
+                self._cumulative[subscription] = head
+                self._add_pending()
+        else:
+            self._individual.append((subscription, message_id))
+            self._add_pending()
+
+    def discard(self, subscription: str, message_id: str) -> None:
+        delivered = self._delivered.get(subscription)
+        if delivered is not None:
+            delivered.pop(message_id, None)
+
+    def nack(self, subscription: str, message_id: str) -> None:
+        self.discard(subscription, message_id)
+
+        self.flush()
+        self._send_frame("NACK", {"subscription": subscription, "message-id": message_id})
+
+    def _add_pending(self) -> None:
+        if self.pending_acks == 0:
+            self._first_pending_at = self._loop.time()
+
+        self.pending_acks += 1
+
+        if self.pending_acks >= self.max_pending:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.flush_interval, self.flush)
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self.pending_acks:
+            return
+
+        latency = self._loop.time() - self._first_pending_at
+        self.last_flush_latency = latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
+
+        cumulative = self._cumulative
+        individual = self._individual
+
+        self._cumulative = {}
+        self._individual = []
+        self.pending_acks = 0
+
+        for subscription, message_id in cumulative.items():
+            self._send_frame("ACK", {"subscription": subscription, "message-id": message_id})
+
+        for subscription, message_id in individual:
+            self._send_frame("ACK", {"subscription": subscription, "message-id": message_id})
+
+        if self._stats:
+            self._stats.increment("ack_frames", len(cumulative) + len(individual))
+
+    def clear(self) -> None:
+        # The connection is gone, the broker redelivers whatever was not acked
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        self._delivered.clear()
+        self._cumulative = {}
+        self._individual = []
+        self.pending_acks = 0
@@ -1,16 +1,22 @@
 import asyncio
 import functools
+import itertools
 import logging
 import uuid
 import os
-from typing import List, Dict, Optional, Any, Union, Deque, cast
+from typing import List, Dict, Iterable, Mapping, Optional, Any, Deque, cast
 from ssl import SSLContext
 
 from collections import deque, OrderedDict
 
-from aiostomp.protocol import StompProtocol as sp, Frame
+from aiostomp.protocol import StompProtocol as sp, Frame, Body, BytesLike
 from aiostomp.errors import StompError, StompDisconnectedError, ExceededRetryCount
 from aiostomp.subscription import Subscription
+from aiostomp.dispatch import SubscriptionDispatcher, BatchDispatcher
+from aiostomp.ack import AckCoalescer
+from aiostomp.publisher import WindowedPublisher
+from aiostomp.transaction import Transaction, BatchingPublisher
+from aiostomp.pipeline import Pipeline
 from aiostomp.heartbeat import StompHeartbeater
 
 AIOSTOMP_ENABLE_STATS = bool(os.environ.get("AIOSTOMP_ENABLE_STATS", False))
@@ -27,11 +33,15 @@ class AioStompStats:
     def print_stats(self) -> None:
         logger.info("==== AioStomp Stats ====")
         logger.info("Connections count: {}".format(self.connection_count))
-        logger.info(" con | sent_msg | rec_msg ")
+        logger.info(" con | sent_msg | rec_msg | blocked_ms | paused_ms ")
         for index, stats in enumerate(self.connection_stats):
             logger.info(
-                " {:>3} | {:>8} | {:>7} ".format(
-                    index + 1, stats["sent_msg"], stats["rec_msg"]
+                " {:>3} | {:>8} | {:>7} | {:>10} | {:>9} ".format(
+                    index + 1,
+                    stats["sent_msg"],
+                    stats["rec_msg"],
+                    stats.get("write_blocked_ms", 0),
+                    stats.get("read_paused_ms", 0),
                 )
             )
         logger.info("========================")
@@ -42,15 +52,15 @@ class AioStompStats:
         if len(self.connection_stats) > 5:
             self.connection_stats.pop()
 
-    def increment(self, field: str) -> None:
+    def increment(self, field: str, value: int = 1) -> None:
         if len(self.connection_stats) == 0:
             self.new_connection()
 
         if field not in self.connection_stats[0]:
-            self.connection_stats[0][field] = 1
+            self.connection_stats[0][field] = value
             return
 
-        self.connection_stats[0][field] += 1
+        self.connection_stats[0][field] += value
 
     async def run(self) -> None:
         while True:
@@ -67,6 +77,7 @@ class AutoAckContextManager:
         self.ack_mode = ack_mode
         self.result = None
         self.frame: Optional[Frame] = None
+        self.frames: List[Frame] = []
 
     def __enter__(self) -> "AutoAckContextManager":
         return self
@@ -77,14 +88,16 @@ class AutoAckContextManager:
         if not self.enabled:
             return
 
-        if not self.frame:
+        frames = self.frames or ([self.frame] if self.frame else [])
+        if not frames:
             return
 
         if self.ack_mode in ["client", "client-individual"]:
-            if self.result:
-                self.protocol.ack(self.frame)
-            else:
-                self.protocol.nack(self.frame)
+            for frame in frames:
+                if self.result:
+                    self.protocol.ack(frame)
+                else:
+                    self.protocol.nack(frame)
 
 
 class AioStomp:
@@ -101,6 +114,13 @@ class AioStomp:
         heartbeat_interval_cy: int = 1000,
         error_handler=None,
         loop: Optional[asyncio.AbstractEventLoop] = None,
+        lazy_headers: bool = False,
+        write_buffer_high: Optional[int] = None,
+        write_buffer_low: Optional[int] = None,
+        max_inflight_messages: Optional[int] = None,
+        max_inflight_bytes: Optional[int] = None,
+        ack_flush_interval_ms: Optional[int] = None,
+        ack_flush_size: int = 100,
     ):
 
         self._heartbeat = {
@@ -128,9 +148,17 @@ class AioStomp:
             client_id=client_id,
             stats=self._stats,
             loop=self._loop,
+            lazy_headers=lazy_headers,
+            write_buffer_high=write_buffer_high,
+            write_buffer_low=write_buffer_low,
+            max_inflight_messages=max_inflight_messages,
+            max_inflight_bytes=max_inflight_bytes,
+            ack_flush_interval_ms=ack_flush_interval_ms,
+            ack_flush_size=ack_flush_size,
         )
         self._last_subscribe_id = 0
         self._subscriptions: Dict[str, Subscription] = {}
+        self._last_transaction_id = 0
 
         self._connected = False
         self._closed = False
@@ -237,7 +265,21 @@ class AioStomp:
         extra_headers=None,
         handler=None,
         auto_ack=True,
+        body_view=False,
+        concurrency=1,
+        batch_handler=None,
+        max_batch=100,
+        max_wait_ms=50,
     ) -> Subscription:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        if handler is not None and batch_handler is not None:
+            raise ValueError("Use either handler or batch_handler, not both")
+
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+
         extra_headers = extra_headers or {}
         self._last_subscribe_id += 1
 
@@ -248,6 +290,11 @@ class AioStomp:
             extra_headers=extra_headers,
             handler=handler,
             auto_ack=auto_ack,
+            body_view=body_view,
+            concurrency=concurrency,
+            batch_handler=batch_handler,
+            max_batch=max_batch,
+            max_wait_ms=max_wait_ms,
         )
 
         self._subscriptions[str(self._last_subscribe_id)] = subscription
@@ -264,7 +311,7 @@ class AioStomp:
             self._protocol.unsubscribe(subscription)
             del self._subscriptions[subscription_id]
 
-    def _encode(self, value: Union[str, bytes]) -> bytes:
+    def _encode(self, value: Body) -> BytesLike:
         if isinstance(value, str):
             return value.encode("utf-8")
         return value
@@ -272,10 +319,11 @@ class AioStomp:
     def send(
         self,
         destination: str,
-        body: Union[str, bytes] = "",
+        body: Body = "",
         headers: Optional[Dict[str, Any]] = None,
         send_content_length=True,
-    ) -> None:
+        receipt=False,
+    ) -> Optional[asyncio.Future]:
         headers = headers or {}
         headers["destination"] = destination
 
@@ -284,9 +332,94 @@ class AioStomp:
         # ActiveMQ determines the type of a message by the
         # inclusion of the content-length header
         if send_content_length:
-            headers["content-length"] = len(body_b)
+            if isinstance(body_b, memoryview):
+                headers["content-length"] = body_b.nbytes
+            else:
+                headers["content-length"] = len(body_b)
+
+        if receipt:
+            # Resolved when the broker confirms the message with a RECEIPT
+            return self._protocol.send(headers, body_b, receipt=True)
 
         self._protocol.send(headers, body_b)
+        return None
+
+    async def send_async(
+        self,
+        destination: str,
+        body: Body = "",
+        headers: Optional[Dict[str, Any]] = None,
+        send_content_length=True,
+        receipt=False,
+    ) -> Optional[asyncio.Future]:
+        future = self.send(destination, body, headers, send_content_length, receipt)
+
+        # Wait while the transport buffer is over its high-water mark
+        await self._protocol.drain()
+
+        return future
+
+    async def drain(self) -> None:
+        await self._protocol.drain()
+
+    async def send_many_async(
+        self,
+        destination: str,
+        bodies: Iterable[Body],
+        headers: Optional[Dict[str, Any]] = None,
+        send_content_length=True,
+    ) -> None:
+        headers = headers or {}
+
+        for body in bodies:
+            self.send(destination, body, dict(headers), send_content_length)
+            await self._protocol.drain()
+
+    def windowed_publisher(self, window: int = 100) -> WindowedPublisher:
+        return WindowedPublisher(self, window=window)
+
+    def transaction(self, receipt: bool = True) -> Transaction:
+        self._last_transaction_id += 1
+        return Transaction(self, f"tx-{self._last_transaction_id}", receipt=receipt)
+
+    def batching_publisher(
+        self, max_messages: int = 100, max_wait_ms: int = 100, receipt: bool = True
+    ) -> BatchingPublisher:
+        return BatchingPublisher(
+            self, max_messages=max_messages, max_wait_ms=max_wait_ms, receipt=receipt
+        )
+
+    def pipeline(
+        self,
+        source: str,
+        destination: str,
+        transform,
+        max_batch: int = 100,
+        max_wait_ms: int = 50,
+        concurrency: int = 1,
+        ack: str = "client-individual",
+        receipt: bool = True,
+    ) -> Pipeline:
+        return Pipeline(
+            self,
+            source,
+            destination,
+            transform,
+            max_batch=max_batch,
+            max_wait_ms=max_wait_ms,
+            concurrency=concurrency,
+            ack=ack,
+            receipt=receipt,
+        )
+
+    def begin(self, transaction: str) -> None:
+        self._protocol.begin(transaction)
+
+    def commit(self, transaction: str, receipt=False) -> Optional[asyncio.Future]:
+        return self._protocol.commit(transaction, receipt=receipt)
+
+    def abort(self, transaction: str) -> None:
+        self._protocol.abort(transaction)
 
     def _subscription_auto_ack(self, frame: Frame) -> bool:
         key = frame.headers.get("subscription", "")
@@ -302,23 +435,60 @@ class AioStomp:
 
         return False
 
-    def ack(self, frame: Frame) -> None:
+    def ack(self, frame: Frame, transaction: Optional[str] = None) -> None:
         if self._subscription_auto_ack(frame):
             return
 
-        self._protocol.ack(frame)
+        self._protocol.ack(frame, transaction=transaction)
 
-    def nack(self, frame: Frame) -> None:
+    def nack(self, frame: Frame, transaction: Optional[str] = None) -> None:
         if self._subscription_auto_ack(frame):
             return
 
-        self._protocol.nack(frame)
+        self._protocol.nack(frame, transaction=transaction)
 
     def get(self, key: str) -> Optional[Subscription]:
         return self._subscriptions.get(key)
 
+    @property
+    def inflight_messages(self) -> int:
+        return self._protocol.inflight_messages
+
+    @property
+    def inflight_bytes(self) -> int:
+        return self._protocol.inflight_bytes
+
+    @property
+    def reading_paused(self) -> bool:
+        return self._protocol.reading_paused
+
+    @property
+    def read_paused_time(self) -> float:
+        return self._protocol.read_paused_time
+
+    @property
+    def pending_receipts(self) -> int:
+        return self._protocol.pending_receipts
+
+    @property
+    def pending_acks(self) -> int:
+        return self._protocol.pending_acks
+
+    @property
+    def ack_flush_latency(self) -> float:
+        return self._protocol.ack_flush_latency
+
 
 class StompReader(asyncio.Protocol):
+
+    # Bodies at least this large are handed to transport.writelines
+    # alongside the frame prefix instead of being joined into one buffer.
+    SCATTER_WRITE_SIZE = 64 * 1024
+
+    # Everything written during one loop iteration is flushed with a
+    # single write at the end of it, unless the buffer grows past this.
+    MAX_WRITE_BUFFER_SIZE = 256 * 1024
+
     def __init__(
         self,
         frame_handler: AioStomp,
@@ -328,6 +498,13 @@ class StompReader(asyncio.Protocol):
         password: Optional[str] = None,
         client_id: Optional[str] = None,
         stats: Optional[AioStompStats] = None,
+        lazy_headers: bool = False,
+        write_buffer_high: Optional[int] = None,
+        write_buffer_low: Optional[int] = None,
+        max_inflight_messages: Optional[int] = None,
+        max_inflight_bytes: Optional[int] = None,
+        ack_flush_interval_ms: Optional[int] = None,
+        ack_flush_size: int = 100,
     ):
 
         self.handlers_map = {
@@ -347,8 +524,42 @@ class StompReader(asyncio.Protocol):
         self._waiter = None
         self._frames: Deque[bytes] = deque()
 
+        self._receipt_ids = itertools.count(1)
+        self._receipts: Dict[str, asyncio.Future] = {}
+        self._dispatchers: Dict[int, SubscriptionDispatcher] = {}
+
+        # Messages handed to dispatchers whose handlers have not finished
+        self.max_inflight_messages = max_inflight_messages
+        self.max_inflight_bytes = max_inflight_bytes
+        self.inflight_messages = 0
+        self.inflight_bytes = 0
+        self.reading_paused = False
+        self.read_paused_time = 0.0
+        self._read_paused_at = 0.0
+
+        self._acks: Optional[AckCoalescer] = None
+        if ack_flush_interval_ms is not None:
+            self._acks = AckCoalescer(
+                self.send_frame,
+                loop,
+                flush_interval=ack_flush_interval_ms / 1000.0,
+                max_pending=ack_flush_size,
+                stats=stats,
+            )
+
+        self._write_buffer: List[BytesLike] = []
+        self._write_buffer_size = 0
+        self._write_buffer_scatter = False
+        self._flush_handle: Optional[asyncio.Handle] = None
+
+        self._write_buffer_high = write_buffer_high
+        self._write_buffer_low = write_buffer_low
+        self._write_paused = False
+        self._drain_waiter: Optional[asyncio.Future] = None
+
         self._transport: Optional[asyncio.Transport] = None
-        self._protocol = sp()
+        self._protocol = sp(lazy_headers=lazy_headers)
+        self._protocol.body_view_filter = self._wants_body_view
         self._connect_headers: OrderedDict[str, str] = OrderedDict()
 
         self._connect_headers["accept-version"] = "1.1"
@@ -371,6 +582,11 @@ class StompReader(asyncio.Protocol):
     def close(self) -> None:
         # Close the transport only if already connection is made
         if self._transport:
+            # Send whatever is still buffered before closing
+            if self._acks:
+                self._acks.flush()
+            self.flush()
+
             # Close the transport to stomp receiving any more data
             self._transport.close()
 
@@ -388,10 +604,10 @@ class StompReader(asyncio.Protocol):
         self,
         command: str,
         headers: Optional[Dict[str, Any]] = None,
-        body: Union[str, bytes] = b"",
+        body: Body = b"",
     ) -> None:
         headers = {} if headers is None else headers
-        buf = self._protocol.build_frame(command, headers, body)
+        parts = self._protocol.build_frame_parts(command, headers, body)
 
         if not self._transport:
             raise StompDisconnectedError()
@@ -399,23 +615,170 @@ class StompReader(asyncio.Protocol):
         if self._stats:
             self._stats.increment("sent_msg")
 
-        self._transport.write(buf)
+        self._write(parts)
 
-    def ack(self, frame: Frame) -> None:
-        headers = {
-            "subscription": frame.headers["subscription"],
-            "message-id": frame.headers["message-id"],
-        }
+    def send_frame_with_receipt(
+        self,
+        command: str,
+        headers: Optional[Dict[str, Any]] = None,
+        body: Body = b"",
+    ) -> asyncio.Future:
+        headers = {} if headers is None else headers
+
+        receipt_id = str(next(self._receipt_ids))
+        headers["receipt"] = receipt_id
+
+        self.send_frame(command, headers, body)
+
+        future = self._loop.create_future()
+        self._receipts[receipt_id] = future
+        return future
+
+    @property
+    def pending_receipts(self) -> int:
+        return len(self._receipts)
+
+    def _handle_receipt(self, frame: Frame) -> None:
+        future = self._receipts.pop(frame.headers.get("receipt-id", ""), None)
+        if future is None:
+            logger.warning("Unexpected receipt: %s", frame.headers.get("receipt-id"))
+            return
+
+        if not future.done():
+            future.set_result(None)
+
+    def _fail_receipts(self, exc: Exception) -> None:
+        receipts = self._receipts
+        self._receipts = {}
+
+        for future in receipts.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    def write(self, data: BytesLike) -> None:
+        self._write([data])
+
+    def _write(self, parts: List[BytesLike]) -> None:
+        self._write_buffer.extend(parts)
+
+        for part in parts:
+            size = len(part)
+            self._write_buffer_size += size
+            if size >= self.SCATTER_WRITE_SIZE:
+                self._write_buffer_scatter = True
+
+        if self._write_buffer_size >= self.MAX_WRITE_BUFFER_SIZE:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_soon(self._scheduled_flush)
+
+    def _scheduled_flush(self) -> None:
+        # The handle is the one running, no need to cancel it
+        self._flush_handle = None
+        self.flush()
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._write_buffer:
+            return
+
+        parts = self._write_buffer
+        scatter = self._write_buffer_scatter
+
+        self._write_buffer = []
+        self._write_buffer_size = 0
+        self._write_buffer_scatter = False
+
+        if not self._transport:
+            return
+
+        if len(parts) == 1:
+            self._transport.write(parts[0])
+        elif scatter:
+            self._transport.writelines(parts)
+        else:
+            self._transport.write(b"".join(parts))
+
+    def pause_writing(self) -> None:
+        self._write_paused = True
+
+    def resume_writing(self) -> None:
+        self._write_paused = False
+        self._wake_drain_waiter()
+
+    def _wake_drain_waiter(self, exc: Optional[Exception] = None) -> None:
+        waiter = self._drain_waiter
+        self._drain_waiter = None
+
+        if waiter is None or waiter.done():
+            return
+
+        if exc is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(exc)
+
+    async def drain(self) -> None:
+        if not self._transport:
+            raise StompDisconnectedError()
+
+        if not self._write_paused:
+            return
+
+        if self._drain_waiter is None:
+            self._drain_waiter = self._loop.create_future()
+
+        # Every caller shares the same waiter, shield it so a cancelled
+        # caller does not cancel the others.
+        start = self._loop.time()
+        try:
+            await asyncio.shield(self._drain_waiter)
+        finally:
+            if self._stats:
+                self._stats.increment("write_blocked")
+                self._stats.increment(
+                    "write_blocked_ms", int((self._loop.time() - start) * 1000)
+                )
+
+    @property
+    def pending_acks(self) -> int:
+        return self._acks.pending_acks if self._acks else 0
+
+    @property
+    def ack_flush_latency(self) -> float:
+        return self._acks.last_flush_latency if self._acks else 0.0
+
+    def ack(self, frame: Frame, transaction: Optional[str] = None) -> None:
+        if self._acks and transaction is None:
+            self._acks.ack(frame.headers["subscription"], frame.headers["message-id"])
+            return
+
+        self._send_ack("ACK", frame, transaction)
+
+    def nack(self, frame: Frame, transaction: Optional[str] = None) -> None:
+        if self._acks and transaction is None:
+            self._acks.nack(frame.headers["subscription"], frame.headers["message-id"])
+            return
 
-        return self.send_frame("ACK", headers)
+        self._send_ack("NACK", frame, transaction)
 
-    def nack(self, frame: Frame) -> None:
+    def _send_ack(self, command: str, frame: Frame, transaction: Optional[str]) -> None:
         headers = {
             "subscription": frame.headers["subscription"],
             "message-id": frame.headers["message-id"],
         }
 
-        self.send_frame("NACK", headers)
+        if transaction is not None:
+            headers["transaction"] = transaction
+
+            # Acked by the transaction, no longer holds back coalesced acks
+            if self._acks:
+                self._acks.discard(frame.headers["subscription"], frame.headers["message-id"])
+
+        self.send_frame(command, headers)
 
     def connection_made(self, transport: asyncio.Transport) -> None:
         logger.info("Connected")
@@ -423,6 +786,11 @@ class StompReader(asyncio.Protocol):
 
         self._transport = transport
 
+        if self._write_buffer_high is not None or self._write_buffer_low is not None:
+            transport.set_write_buffer_limits(
+                high=self._write_buffer_high, low=self._write_buffer_low
+            )
+
         self.connect()
 
     def connection_lost(self, exc: Optional[Exception]) -> None:
@@ -432,6 +800,26 @@ class StompReader(asyncio.Protocol):
 
         self._transport = None
 
+        # Drop anything still buffered, there is nowhere to send it
+        self.flush()
+
+        self._write_paused = False
+        self._wake_drain_waiter(StompDisconnectedError())
+
+        if self._acks:
+            self._acks.clear()
+
+        # The broker will never confirm these
+        self._fail_receipts(StompDisconnectedError())
+
+        # Let the workers finish what was already received and exit
+        for dispatcher in self._dispatchers.values():
+            dispatcher.close()
+        self._dispatchers.clear()
+
+        if self.reading_paused:
+            self._stop_read_pause()
+
         if self.heartbeater:
             self.heartbeater.shutdown()
             self.heartbeater = None
@@ -451,9 +839,140 @@ class StompReader(asyncio.Protocol):
                 interval = max(self.heartbeat.get("cx", 0), sy)
                 logger.debug("Sending heartbeats every %sms", interval)
                 self.heartbeater = StompHeartbeater(
-                    self._transport, interval=interval, logger=logger)
+                    self, interval=interval, logger=logger)
                 await self.heartbeater.start()
 
+    def _wants_body_view(self, headers: Mapping[str, str]) -> bool:
+        if self._frame_handler is None:
+            return False
+
+        subscription = self._frame_handler.get(headers.get("subscription", ""))
+        return bool(subscription and subscription.body_view)
+
+    def _dispatch_message(self, frame: Frame) -> None:
+        subscription = None
+        if self._frame_handler is not None:
+            subscription = self._frame_handler.get(frame.headers.get("subscription", ""))
+
+        if subscription is None:
+            # Nothing to queue it on, let the handler report it
+            self._loop.create_task(self._handle_message(frame))
+            return
+
+        dispatcher = self._dispatchers.get(subscription.id)
+        if dispatcher is None:
+            dispatcher = self._create_dispatcher(subscription)
+            self._dispatchers[subscription.id] = dispatcher
+
+        if self._acks and subscription.ack == "client":
+            # Cumulative acks must follow the delivery order
+            self._acks.delivered(frame.headers["subscription"], frame.headers["message-id"])
+
+        dispatcher.put(frame)
+
+        self.inflight_messages += 1
+        self.inflight_bytes += self._body_size(frame)
+
+        if not self.reading_paused and self._over_inflight_budget():
+            self._pause_reading()
+
+    def _create_dispatcher(self, subscription: Subscription) -> SubscriptionDispatcher:
+        if subscription.batch_handler is not None:
+            return BatchDispatcher(
+                functools.partial(self._process_dispatched_batch, subscription),
+                self._loop,
+                concurrency=subscription.concurrency,
+                max_batch=subscription.max_batch,
+                max_wait=subscription.max_wait_ms / 1000.0,
+            )
+
+        return SubscriptionDispatcher(
+            functools.partial(self._process_dispatched, subscription),
+            self._loop,
+            concurrency=subscription.concurrency,
+        )
+
+    @staticmethod
+    def _body_size(frame: Frame) -> int:
+        return len(frame.body) if frame.body else 0
+
+    def _over_inflight_budget(self) -> bool:
+        if self.max_inflight_messages is not None:
+            if self.inflight_messages >= self.max_inflight_messages:
+                return True
+
+        if self.max_inflight_bytes is not None:
+            if self.inflight_bytes >= self.max_inflight_bytes:
+                return True
+
+        return False
+
+    def _pause_reading(self) -> None:
+        if not self._transport:
+            return
+
+        # The broker stops sending once its prefetch window is full
+        logger.debug("Pausing reading, %s messages in flight", self.inflight_messages)
+        self._transport.pause_reading()
+        self.reading_paused = True
+        self._read_paused_at = self._loop.time()
+
+    def _stop_read_pause(self) -> None:
+        self.reading_paused = False
+
+        paused = self._loop.time() - self._read_paused_at
+        self.read_paused_time += paused
+
+        if self._stats:
+            self._stats.increment("read_paused")
+            self._stats.increment("read_paused_ms", int(paused * 1000))
+
+    def _resume_reading(self) -> None:
+        logger.debug("Resuming reading, %s messages in flight", self.inflight_messages)
+        self._stop_read_pause()
+
+        if self._transport:
+            self._transport.resume_reading()
+
+    def _release_inflight(self, frames: List[Frame]) -> None:
+        self.inflight_messages -= len(frames)
+        for frame in frames:
+            self.inflight_bytes -= self._body_size(frame)
+
+        if self.reading_paused and not self._over_inflight_budget():
+            self._resume_reading()
+
+    async def _process_dispatched(self, subscription: Subscription, frame: Frame) -> None:
+        try:
+            await self._process_message(subscription, frame)
+        finally:
+            self._release_inflight([frame])
+
+    async def _process_dispatched_batch(
+        self, subscription: Subscription, frames: List[Frame]
+    ) -> None:
+        try:
+            await self._process_batch(subscription, frames)
+        finally:
+            self._release_inflight(frames)
+
+    async def _process_batch(self, subscription: Subscription, frames: List[Frame]) -> None:
+        if self._stats:
+            self._stats.increment("rec_msg", len(frames))
+
+        with AutoAckContextManager(
+            self, ack_mode=subscription.ack, enabled=subscription.auto_ack
+        ) as ack_context:
+            result = await subscription.batch_handler(frames)
+
+            ack_context.frames = frames
+            ack_context.result = result
+
+    def remove_dispatcher(self, subscription: Subscription) -> None:
+        dispatcher = self._dispatchers.pop(subscription.id, None)
+        if dispatcher is not None:
+            dispatcher.close()
+
     async def _handle_message(self, frame: Frame) -> None:
         key = frame.headers.get("subscription", "")
 
@@ -462,6 +981,9 @@ class StompReader(asyncio.Protocol):
             logger.warning("Subscription %s not found", key)
             return
 
+        await self._process_message(subscription, frame)
+
+    async def _process_message(self, subscription: Subscription, frame: Frame) -> None:
         if self._stats:
             self._stats.increment("rec_msg")
 
@@ -479,6 +1001,10 @@ class StompReader(asyncio.Protocol):
         logger.error("Received error: %s" % message)
         logger.debug("Error details: %s" % frame.body)
 
+        future = self._receipts.pop(frame.headers.get("receipt-id", ""), None)
+        if future is not None and not future.done():
+            future.set_exception(StompError(message, frame.body))
+
         if self._frame_handler._on_error:
             await self._frame_handler._on_error(StompError(message, frame.body))
 
@@ -492,7 +1018,11 @@ class StompReader(asyncio.Protocol):
         self._protocol.feed_data(data)
 
         for frame in self._protocol.pop_frames():
-            if frame.command != "HEARTBEAT":
+            if frame.command == "MESSAGE":
+                self._dispatch_message(frame)
+            elif frame.command == "RECEIPT":
+                self._handle_receipt(frame)
+            elif frame.command != "HEARTBEAT":
                 self._loop.create_task(
                     self.handlers_map.get(frame.command, self._handle_exception)(frame)
                 )
@@ -512,6 +1042,13 @@ class StompProtocol:
         ssl_context: Optional[SSLContext] = None,
         client_id: Optional[str] = None,
         stats: Optional[AioStompStats] = None,
+        lazy_headers: bool = False,
+        write_buffer_high: Optional[int] = None,
+        write_buffer_low: Optional[int] = None,
+        max_inflight_messages: Optional[int] = None,
+        max_inflight_bytes: Optional[int] = None,
+        ack_flush_interval_ms: Optional[int] = None,
+        ack_flush_size: int = 100,
     ):
 
         self.host = host
@@ -519,6 +1056,13 @@ class StompProtocol:
         self.ssl_context = ssl_context
         self.client_id = client_id
         self._stats = stats
+        self.lazy_headers = lazy_headers
+        self.write_buffer_high = write_buffer_high
+        self.write_buffer_low = write_buffer_low
+        self.max_inflight_messages = max_inflight_messages
+        self.max_inflight_bytes = max_inflight_bytes
+        self.ack_flush_interval_ms = ack_flush_interval_ms
+        self.ack_flush_size = ack_flush_size
 
         if loop is None:
             loop = asyncio.get_event_loop()
@@ -540,6 +1084,13 @@ class StompProtocol:
             loop=self._loop,
             heartbeat=self._heartbeat,
             stats=self._stats,
+            lazy_headers=self.lazy_headers,
+            write_buffer_high=self.write_buffer_high,
+            write_buffer_low=self.write_buffer_low,
+            max_inflight_messages=self.max_inflight_messages,
+            max_inflight_bytes=self.max_inflight_bytes,
+            ack_flush_interval_ms=self.ack_flush_interval_ms,
+            ack_flush_size=self.ack_flush_size,
         )
 
         trans, proto = await self._loop.create_connection(
@@ -553,6 +1104,34 @@ class StompProtocol:
         if self._protocol:
             self._protocol.close()
 
+    @property
+    def inflight_messages(self) -> int:
+        return self._protocol.inflight_messages if self._protocol else 0
+
+    @property
+    def inflight_bytes(self) -> int:
+        return self._protocol.inflight_bytes if self._protocol else 0
+
+    @property
+    def reading_paused(self) -> bool:
+        return self._protocol.reading_paused if self._protocol else False
+
+    @property
+    def read_paused_time(self) -> float:
+        return self._protocol.read_paused_time if self._protocol else 0.0
+
+    @property
+    def pending_receipts(self) -> int:
+        return self._protocol.pending_receipts if self._protocol else 0
+
+    @property
+    def pending_acks(self) -> int:
+        return self._protocol.pending_acks if self._protocol else 0
+
+    @property
+    def ack_flush_latency(self) -> float:
+        return self._protocol.ack_flush_latency if self._protocol else 0.0
+
     def subscribe(self, subscription: Subscription) -> None:
         if self._protocol is None:
             raise RuntimeError("Not connected")
@@ -570,16 +1149,50 @@ class StompProtocol:
         if self._protocol:
             headers = {"id": subscription.id, "destination": subscription.destination}
             self._protocol.send_frame("UNSUBSCRIBE", headers)
+            self._protocol.remove_dispatcher(subscription)
 
-    def send(self, headers: Dict[str, Any], body: Union[bytes, str]) -> None:
+    def send(
+        self, headers: Dict[str, Any], body: Body, receipt: bool = False
+    ) -> Optional[asyncio.Future]:
         if self._protocol is None:
             raise RuntimeError("Not connected")
+
+        if receipt:
+            return self._protocol.send_frame_with_receipt("SEND", headers, body)
+
         self._protocol.send_frame("SEND", headers, body)
+        return None
+
+    def begin(self, transaction: str) -> None:
+        if self._protocol is None:
+            raise RuntimeError("Not connected")
+        self._protocol.send_frame("BEGIN", {"transaction": transaction})
+
+    def commit(self, transaction: str, receipt: bool = False) -> Optional[asyncio.Future]:
+        if self._protocol is None:
+            raise RuntimeError("Not connected")
+
+        headers = {"transaction": transaction}
+        if receipt:
+            return self._protocol.send_frame_with_receipt("COMMIT", headers)
+
+        self._protocol.send_frame("COMMIT", headers)
+        return None
+
+    def abort(self, transaction: str) -> None:
+        if self._protocol is None:
+            raise RuntimeError("Not connected")
+        self._protocol.send_frame("ABORT", {"transaction": transaction})
+
+    async def drain(self) -> None:
+        if self._protocol is None:
+            raise RuntimeError("Not connected")
+        await self._protocol.drain()
 
-    def ack(self, frame: Frame) -> None:
+    def ack(self, frame: Frame, transaction: Optional[str] = None) -> None:
         if self._protocol:
-            self._protocol.ack(frame)
+            self._protocol.ack(frame, transaction=transaction)
 
-    def nack(self, frame: Frame) -> None:
+    def nack(self, frame: Frame, transaction: Optional[str] = None) -> None:
         if self._protocol:
-            self._protocol.nack(frame)
+            self._protocol.nack(frame, transaction=transaction)
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Deque, List, Optional, Set
+
+from collections import deque
+
+from aiostomp.frame import Frame
+
+logger = logging.getLogger("aiostomp")
+
+
+class SubscriptionDispatcher:
+    """Runs the handler of one subscription on a bounded set of workers.
+
+    Frames are queued in arrival order and picked up by at most
+    `concurrency` worker tasks, started on demand. With a single worker
+    frames are handled strictly in order.
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[Any], Awaitable[None]],
+        loop: asyncio.AbstractEventLoop,
+        concurrency: int = 1,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.concurrency = concurrency
+
+        self._handle = handle
+        self._loop = loop
+        self._frames: Deque[Frame] = deque()
+        self._idle: Deque[asyncio.Future] = deque()
+        self._workers: Set[asyncio.Task] = set()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def put(self, frame: Frame) -> None:
+        if self._closed:
+            raise RuntimeError("Dispatcher is closed")
+
+        self._frames.append(frame)
+        self._wake_worker()
+
+    def _wake_worker(self) -> None:
+        while self._idle:
+            waiter = self._idle.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        if len(self._workers) < self.concurrency:
+            worker = self._loop.create_task(self._run())
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+
+    def close(self) -> None:
+        # Workers exit once the frames already queued are handled
+        self._closed = True
+
+        while self._idle:
+            waiter = self._idle.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _run(self) -> None:
+        while True:
+            while self._frames:
+                frame = self._frames.popleft()
+                try:
+                    await self._handle(frame)
+                except Exception:
+                    logger.exception("Error handling message")
+
+            if self._closed:
+                return
+
+            await self._wait_idle()
+
+    async def _wait_idle(self) -> None:
+        waiter = self._loop.create_future()
+        self._idle.append(waiter)
+        await waiter
+
+
+class BatchDispatcher(SubscriptionDispatcher):
+    """Hands frames to the handler in lists of up to `max_batch`.
+
+    A worker that finds fewer frames queued waits up to `max_wait`
+    seconds for the batch to fill before handling what it has.
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[List[Frame]], Awaitable[None]],
+        loop: asyncio.AbstractEventLoop,
+        concurrency: int = 1,
+        max_batch: int = 100,
+        max_wait: float = 0.05,
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+
+        super().__init__(handle, loop, concurrency)
+
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        # Set while a worker waits for the current batch to fill
+        self._filled: Optional[asyncio.Future] = None
+
+    def put(self, frame: Frame) -> None:
+        if self._closed:
+            raise RuntimeError("Dispatcher is closed")
+
+        self._frames.append(frame)
+
+        if self._filled is None:
+            self._wake_worker()
+        elif len(self._frames) >= self.max_batch:
+            self._set_filled()
+
+    def close(self) -> None:
+        super().close()
+        self._set_filled()
+
+    def _set_filled(self) -> None:
+        if self._filled is not None and not self._filled.done():
+            self._filled.set_result(None)
+
+    async def _wait_filled(self) -> None:
+        self._filled = self._loop.create_future()
+        timeout = self._loop.call_later(self.max_wait, self._set_filled)
+        try:
+            await self._filled
+        finally:
+            timeout.cancel()
+            self._filled = None
+
+    async def _run(self) -> None:
+        while True:
+            if self._frames:
+                if len(self._frames) < self.max_batch and not self._closed:
+                    if self._filled is not None:
+                        # Another worker is already collecting this batch
+                        await self._wait_idle()
+                        continue
+
+                    await self._wait_filled()
+
+                batch = []
+                while self._frames and len(batch) < self.max_batch:
+                    batch.append(self._frames.popleft())
+
+                try:
+                    await self._handle(batch)
+                except Exception:
+                    logger.exception("Error handling messages")
+
+                continue
+
+            if self._closed:
+                return
+
+            await self._wait_idle()
@@ -1,9 +1,102 @@
-from typing import Dict, Union
+from typing import Callable, Dict, Iterator, Mapping, Union
+
+
+class LazyHeaders(Mapping[str, str]):
+    """Read-only mapping over the raw header block of a received frame.
+
+    Nothing is decoded up front: looking up a header searches the raw
+    block for it and only that value is unescaped and decoded, then
+    cached. Iterating or taking the length decodes the whole block once.
+    As with the eager parser, the last occurrence of a repeated header wins.
+    """
+
+    __slots__ = ("_raw", "_start", "_decode", "_decode_name", "_decoded", "_complete")
+
+    def __init__(
+        self,
+        raw: bytes,
+        start: int,
+        decode: Callable[[bytes], str],
+        decode_name: Callable[[bytes], str],
+    ):
+        # raw[start:] holds the header lines, starting with the newline
+        # that ends the command line and ending with a newline.
+        self._raw = raw
+        self._start = start
+        self._decode = decode
+        self._decode_name = decode_name
+        self._decoded: Dict[str, str] = {}
+        self._complete = False
+
+    def _find(self, key: str) -> int:
+        return self._raw.rfind(b"\n" + key.encode("utf-8") + b":", self._start)
+
+    def __getitem__(self, key: str) -> str:
+        try:
+            return self._decoded[key]
+        except KeyError:
+            pass
+
+        if self._complete:
+            raise KeyError(key)
+
+        index = self._find(key)
+        if index == -1:
+            raise KeyError(key)
+
+        value_start = index + len(key.encode("utf-8")) + 2
+        value_end = self._raw.find(b"\n", value_start)
+        value = self._raw[value_start:value_end]
+        if value.endswith(b"\r"):
+            value = value[:-1]
+
+        decoded = self._decode(value)
+        self._decoded[key] = decoded
+        return decoded
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+
+        if key in self._decoded:
+            return True
+
+        return not self._complete and self._find(key) != -1
+
+    def _decode_all(self) -> Dict[str, str]:
+        if not self._complete:
+            for line in self._raw[self._start:].split(b"\n"):
+                if line.endswith(b"\r"):
+                    line = line[:-1]
+
+                if not line:
+                    continue
+
+                name, _, value = line.partition(b":")
+                self._decoded[self._decode_name(name)] = self._decode(value)
+
+            self._complete = True
+
+        return self._decoded
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._decode_all())
+
+    def __len__(self) -> int:
+        return len(self._decode_all())
+
+    def __repr__(self) -> str:
+        return repr(self._decode_all())
 
 
 class Frame:
+    __slots__ = ("command", "headers", "body")
+
     def __init__(
-        self, command: str, headers: Dict[str, str], body: Union[str, bytes, None]
+        self,
+        command: str,
+        headers: Mapping[str, str],
+        body: Union[str, bytes, None],
     ):
         self.command = command
         if "\n" in self.command:
@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from typing import Optional
+from typing import Any, Optional
 
 from contextlib import suppress
 
@@ -11,7 +11,7 @@ class StompHeartbeater:
 
     def __init__(
         self,
-        transport: asyncio.Transport,
+        transport: Any,
         logger: logging.Logger = None,
         interval: int = 1000,
     ):
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, TYPE_CHECKING
+
+from aiostomp.errors import StompDisconnectedError
+from aiostomp.protocol import Body, Frame
+from aiostomp.subscription import Subscription
+
+if TYPE_CHECKING:
+    from aiostomp.aiostomp import AioStomp
+
+
+logger = logging.getLogger("aiostomp")
+
+
+class Pipeline:
+    """Consumes `source`, transforms each message and publishes to `destination`.
+
+    Messages are handled in batches of up to `max_batch`. The outputs of
+    a batch are sent and its inputs acked in one transaction, so a batch
+    is either fully processed or, if the transform raises or the commit
+    fails, not at all: the transaction is aborted and its inputs nacked
+    for redelivery.
+
+    `transform(frame, body)` returns the body to publish, or None to
+    publish nothing for that message.
+    """
+
+    def __init__(
+        self,
+        client: "AioStomp",
+        source: str,
+        destination: str,
+        transform: Callable[[Frame, Any], Awaitable[Optional[Body]]],
+        max_batch: int = 100,
+        max_wait_ms: int = 50,
+        concurrency: int = 1,
+        ack: str = "client-individual",
+        receipt: bool = True,
+    ):
+        if ack not in ("client", "client-individual"):
+            raise ValueError("ack must be client or client-individual")
+
+        self.source = source
+        self.destination = destination
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.concurrency = concurrency
+        self.ack = ack
+        self.receipt = receipt
+
+        self.batches = 0
+        self.messages = 0
+        self.failed_batches = 0
+        self.last_batch_latency = 0.0
+        self.max_batch_latency = 0.0
+        self.total_batch_latency = 0.0
+
+        self._client = client
+        self._transform = transform
+        self._subscription: Optional[Subscription] = None
+
+    @property
+    def mean_batch_latency(self) -> float:
+        return self.total_batch_latency / self.batches if self.batches else 0.0
+
+    def start(self) -> Subscription:
+        if self._subscription is not None:
+            raise RuntimeError("Pipeline already started")
+
+        self._subscription = self._client.subscribe(
+            self.source,
+            ack=self.ack,
+            auto_ack=False,
+            batch_handler=self._handle_batch,
+            max_batch=self.max_batch,
+            max_wait_ms=self.max_wait_ms,
+            concurrency=self.concurrency,
+        )
+        return self._subscription
+
+    def stop(self) -> None:
+        if self._subscription is not None:
+            self._client.unsubscribe(self._subscription)
+            self._subscription = None
+
+    async def _handle_batch(self, frames: List[Frame]) -> None:
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+
+        transaction = self._client.transaction(receipt=self.receipt)
+        transaction.begin()
+
+        try:
+            for frame in frames:
+                body = await self._transform(frame, frame.body)
+                if body is not None:
+                    transaction.send(self.destination, body)
+                transaction.ack(frame)
+
+            await self._client.drain()
+            await transaction.commit()
+        except Exception:
+            logger.exception("Pipeline batch of %d messages failed", len(frames))
+            self.failed_batches += 1
+
+            try:
+                if transaction.open:
+                    transaction.abort()
+
+                for frame in frames:
+                    self._client.nack(frame)
+            except StompDisconnectedError:
+                # The broker redelivers whatever was left unacked
+                pass
+            return
+
+        latency = loop.time() - start
+
+        self.batches += 1
+        self.messages += len(frames)
+        self.last_batch_latency = latency
+        self.max_batch_latency = max(self.max_batch_latency, latency)
+        self.total_batch_latency += latency
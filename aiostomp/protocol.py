@@ -1,13 +1,55 @@
 # -*- coding:utf-8 -*-
 import logging
-import itertools
-from collections import deque
-from typing import List, Dict, Union, Any, Optional, Deque
+import sys
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Union, Any, Optional, Tuple, Callable, cast
 
-from aiostomp.frame import Frame
+from aiostomp.frame import Frame, LazyHeaders
 
 logger = logging.getLogger("aiostomp.protocol")
 
+BytesLike = Union[bytes, bytearray, memoryview]
+Body = Union[str, bytes, bytearray, memoryview]
+
+# Well-known header names. Parsed frames reuse these interned strings
+# instead of holding a freshly decoded copy of each name.
+HEADER_NAMES: Dict[bytes, str] = {
+    name.encode("utf-8"): sys.intern(name)
+    for name in (
+        "accept-version",
+        "ack",
+        "content-length",
+        "content-type",
+        "correlation-id",
+        "destination",
+        "expires",
+        "heart-beat",
+        "host",
+        "id",
+        "login",
+        "message",
+        "message-id",
+        "passcode",
+        "persistent",
+        "priority",
+        "receipt",
+        "receipt-id",
+        "redelivered",
+        "reply-to",
+        "server",
+        "session",
+        "subscription",
+        "timestamp",
+        "transaction",
+        "type",
+        "user-id",
+        "version",
+    )
+}
+
+# Heartbeats carry no data, so a single immutable frame is shared by all.
+HEARTBEAT_FRAME = Frame("HEARTBEAT", headers=MappingProxyType({}), body=None)
+
 
 class Stomp:
     V1_0 = "1.0"
@@ -19,24 +61,36 @@ class StompProtocol:
 
     HEART_BEAT = b"\n"
     EOF = b"\x00"
-    CRLFCRLR = [b"\r", b"\n", b"\r", b"\n"]
 
     MAX_DATA_LENGTH = 1024 * 1024 * 100
     MAX_COMMAND_LENGTH = 1024
 
-    def __init__(self) -> None:
+    def __init__(self, lazy_headers: bool = False) -> None:
         self._pending_parts: List[bytes] = []
         self._frames_ready: List[Frame] = []
 
         self.processed_headers = False
-        self.awaiting_command = True
-        self.read_length = 0
         self.content_length = -1
-        self.previous_byte: Optional[bytes] = None
+
+        # Offset in current_command where the next search for a header
+        # terminator or body EOF resumes, so bytes already scanned on a
+        # previous feed_data call are never read again.
+        self._scan_pos = 0
 
         self.action: Optional[str] = None
-        self.headers: Dict[str, str] = {}
-        self.current_command: Deque[int] = deque()
+        self.headers: Mapping[str, str] = {}
+        self.current_command = bytearray()
+
+        # When enabled, received frames keep their raw header block and
+        # decode values on first access instead of in _parse_headers.
+        self.lazy_headers = lazy_headers
+
+        # Decides, from its headers, whether a MESSAGE frame body is
+        # delivered as a read-only memoryview instead of bytes.
+        self.body_view_filter: Optional[Callable[[Mapping[str, str]], bool]] = None
+        self._body_view = False
+        self._body: Optional[bytearray] = None
+        self._body_filled = 0
 
         self._version = Stomp.V1_1
 
@@ -53,202 +107,276 @@ class StompProtocol:
             logging.error("string was: %s", byte_data)
             raise
 
-    def _decode_header(self, header: bytes) -> str:
-        decoded = []
-
-        stream: Deque[int] = deque(header)
-        has_data = True
-
-        while has_data:
-            if not stream:
-                has_data = False
-                break
+    def _decode_name(self, name: bytes) -> str:
+        decoded = HEADER_NAMES.get(name)
+        if decoded is None:
+            decoded = self._decode(name)
+        return decoded
 
-            _b = bytes([stream.popleft()])
-            if _b == b"\\":
-                if len(stream) == 0:
-                    decoded.append(_b)
-                else:
-                    _next = bytes([stream.popleft()])
-                    if _next == b"n":
-                        decoded.append(b"\n")
-                    elif _next == b"c":
-                        decoded.append(b":")
-                    elif _next == b"\\":
-                        decoded.append(b"\\")
-                    elif _next == b"r":
-                        decoded.append(b"\r")
-                    else:
-                        stream.appendleft(_next[0])
-                        decoded.append(_b)
-            else:
-                decoded.append(_b)
-
-        return self._decode(b"".join(decoded))
-
-    def _encode(self, value: Union[str, bytes]) -> bytes:
+    def _decode_header(self, header: bytes) -> str:
+        if b"\\" not in header:
+            return self._decode(header)
+
+        # Escaped backslashes are split out first so that their second
+        # character is never mistaken for the start of another escape.
+        parts = [
+            part.replace(b"\\n", b"\n").replace(b"\\c", b":").replace(b"\\r", b"\r")
+            for part in header.split(b"\\\\")
+        ]
+        return self._decode(b"\\".join(parts))
+
+    def _encode(self, value: Body) -> BytesLike:
         if isinstance(value, str):
             return value.encode("utf-8")
 
         return value
 
     def _encode_header(self, header_value: Any) -> str:
-        value = "{}".format(header_value)
+        value = header_value if isinstance(header_value, str) else "{}".format(header_value)
         if self._version == Stomp.V1_0:
             return value
 
-        encoded = []
-        for c in value:
-            if c == "\n":
-                encoded.append("\\n")
-            elif c == ":":
-                encoded.append("\\c")
-            elif c == "\\":
-                encoded.append("\\\\")
-            elif c == "\r":
-                encoded.append("\\r")
-            else:
-                encoded.append(c)
+        if "\\" not in value and "\n" not in value and ":" not in value and "\r" not in value:
+            return value
 
-        return "".join(encoded)
+        return (
+            value.replace("\\", "\\\\")
+            .replace("\n", "\\n")
+            .replace(":", "\\c")
+            .replace("\r", "\\r")
+        )
 
     def reset(self) -> None:
         self._frames_ready = []
 
     def feed_data(self, inp: bytes) -> None:
-        read_size = len(inp)
-        data: Deque[int] = deque(inp)
-        i = 0
-
-        while i < read_size:
-            i += 1
-            b = bytes([data.popleft()])
-
-            if (
-                not self.processed_headers
-                and self.previous_byte == self.EOF
-                and b == self.EOF
-            ):
-                continue
+        buf = self.current_command
+
+        if self._body is not None and not buf:
+            # Copy straight from the chunk into the body, the receive
+            # buffer only gets whatever follows it.
+            inp = inp[self._fill_body(inp):]
 
+        buf += inp
+
+        size = len(buf)
+        pos = 0
+
+        while pos < size:
             if not self.processed_headers:
-                if self.awaiting_command and b == b"\n":
-                    self._frames_ready.append(Frame("HEARTBEAT", headers={}, body=None))
+                b = buf[pos]
+
+                if b == 0x0A:
+                    self._frames_ready.append(HEARTBEAT_FRAME)
+                    pos += 1
                     continue
-                else:
-                    self.awaiting_command = False
-
-                self.current_command.append(b[0])
-                if b == b"\n" and (
-                    self.previous_byte == b"\n" or ends_with_crlf(self.current_command)
-                ):
-
-                    try:
-                        self.action = self._parse_action(self.current_command)
-                        self.headers = self._parse_headers(self.current_command)
-                        logger.debug("Parsed action %s", self.action)
-
-                        if (
-                            self.action in ("SEND", "MESSAGE", "ERROR")
-                            and "content-length" in self.headers
-                        ):
-                            self.content_length = int(self.headers["content-length"])
-                        else:
-                            self.content_length = -1
-                    except Exception:
-                        self.current_command.clear()
-                        return
-
-                    self.processed_headers = True
-                    self.current_command.clear()
+
+                if b == 0x0D:
+                    if pos + 1 == size:
+                        break
+
+                    if buf[pos + 1] == 0x0A:
+                        self._frames_ready.append(HEARTBEAT_FRAME)
+                        pos += 2
+                        continue
+
+                # Skip any padding left between frames
+                if b == 0x00:
+                    pos += 1
+                    continue
+
+                end, terminator = self._find_headers_end(
+                    buf, max(pos, self._scan_pos), size
+                )
+                if end == -1:
+                    # A terminator may straddle the chunk boundary, keep
+                    # the last two bytes in the next search window.
+                    self._scan_pos = max(pos, size - 2)
+                    break
+
+                self._scan_pos = 0
+
+                try:
+                    self._parse_frame_headers(bytes(buf[pos:end]))
+                except Exception:
+                    logger.exception("Unable to parse frame headers")
+                    self._scan_pos = 0
+                    buf.clear()
+                    return
+
+                self.processed_headers = True
+                pos = end + terminator
             else:
                 if self.content_length == -1:
-                    if b == self.EOF:
-                        self.process_command()
-                    else:
-                        self.current_command.append(b[0])
-
-                        if len(self.current_command) > self.MAX_DATA_LENGTH:
-                            # error
+                    eof = buf.find(self.EOF, max(pos, self._scan_pos))
+                    if eof == -1:
+                        self._scan_pos = size
+                        if size - pos > self.MAX_DATA_LENGTH:
+                            logger.error("Frame body exceeds %s bytes", self.MAX_DATA_LENGTH)
+                            self.processed_headers = False
+                            self._scan_pos = 0
+                            buf.clear()
                             return
+                        break
+
+                    self._scan_pos = 0
+                    self.process_command(buf, pos, eof)
+                    pos = eof + 1
+                elif self._body is not None:
+                    pos = self._read_body_view(buf, pos, size)
+                    if self._body is not None:
+                        break
                 else:
-                    if self.read_length == self.content_length:
-                        self.process_command()
-                        self.read_length = 0
-                    else:
-                        self.read_length += 1
-                        self.current_command.append(b[0])
-
-            self.previous_byte = b
-
-    def process_command(self) -> None:
-        body: Optional[bytes] = bytes(self.current_command)
-        if body == b"":
-            body = None
+                    eof = pos + self.content_length
+                    if eof >= size:
+                        break
+
+                    self.process_command(buf, pos, eof)
+                    pos = eof + 1
+
+        del buf[:pos]
+        if self._scan_pos:
+            self._scan_pos -= pos
+
+    def _read_body_view(self, buf: bytearray, pos: int, size: int) -> int:
+        # Moves the body bytes available in buf into the frame's own
+        # buffer, then emits the frame once the body and its EOF arrived.
+        if self._body_filled < self.content_length:
+            with memoryview(buf) as view:
+                pos += self._fill_body(view[pos:])
+
+        if self._body_filled < self.content_length or pos == size:
+            return pos
+
+        body = memoryview(cast(bytearray, self._body)).toreadonly()
+        self._body = None
+        self._emit_frame(body)
+
+        return pos + 1
+
+    def _fill_body(self, data: Union[bytes, memoryview]) -> int:
+        body = cast(bytearray, self._body)
+
+        take = min(self.content_length - self._body_filled, len(data))
+        with memoryview(data) as view:
+            body[self._body_filled:self._body_filled + take] = view[:take]
+        self._body_filled += take
+
+        return take
+
+    def _find_headers_end(self, buf: bytearray, start: int, size: int) -> Tuple[int, int]:
+        # The header block ends on the first empty line, which may be a
+        # bare LF or a CRLF. Returns the offset of the first byte after the
+        # last header line and the length of the terminator.
+        end = buf.find(b"\n\n", start, size)
+        limit = size if end == -1 else end
+
+        crlf = buf.find(b"\n\r\n", start, limit)
+        if crlf != -1:
+            return crlf + 1, 2
+
+        if end != -1:
+            return end + 1, 1
+
+        return -1, 0
+
+    def _parse_frame_headers(self, data: bytes) -> None:
+        if self.lazy_headers:
+            command_end = data.find(b"\n")
+            self.action = self._parse_action(data[:command_end])
+            self.headers = LazyHeaders(
+                data, command_end, self._decode_header, self._decode_name
+            )
+        else:
+            lines = data.split(b"\n")
+            self.action = self._parse_action(lines[0])
+            self.headers = self._parse_headers(lines[1:])
+
+        logger.debug("Parsed action %s", self.action)
+
+        if self.action in ("SEND", "MESSAGE", "ERROR") and "content-length" in self.headers:
+            self.content_length = int(self.headers["content-length"])
+        else:
+            self.content_length = -1
+
+        self._body_view = bool(
+            self.action == "MESSAGE"
+            and self.body_view_filter is not None
+            and self.body_view_filter(self.headers)
+        )
+
+        if self._body_view and self.content_length > 0:
+            self._body = bytearray(self.content_length)
+            self._body_filled = 0
+
+    def process_command(self, buf: bytearray, start: int, end: int) -> None:
+        body: Union[bytes, memoryview, None] = None
+        if end > start:
+            with memoryview(buf) as view:
+                body = view[start:end].tobytes()
+
+            if self._body_view:
+                body = memoryview(body)
+
+        self._emit_frame(body)
+
+    def _emit_frame(self, body: Union[bytes, memoryview, None]) -> None:
         frame = Frame(self.action or "", self.headers, body)
         self._frames_ready.append(frame)
 
         self.processed_headers = False
-        self.awaiting_command = True
         self.content_length = -1
-        self.current_command.clear()
-
-    def _read_line(self, input: Deque[int]) -> bytes:
-        result = []
-        line_end = False
-        while not line_end:
-            if not input:
-                break
-            b = input.popleft()
-            if b == b"\n"[0]:
-                line_end = True
-                break
-            result.append(b)
-
-        return bytes(result)
-
-    def _parse_action(self, data: Deque[int]) -> str:
-        action = self._read_line(data)
-        return self._decode(action)
-
-    def _parse_headers(self, data: Deque[int]) -> Dict[str, str]:
+        self._body_view = False
+
+    def _parse_action(self, line: bytes) -> str:
+        return self._decode(line.rstrip(b"\r"))
+
+    def _parse_headers(self, lines: List[bytes]) -> Dict[str, str]:
         headers = {}
-        while True:
-            line = self._read_line(data)
-            if len(line) > 1:
-                name, value = line.split(b":", 1)
-                headers[self._decode(name)] = self._decode_header(value)
-            else:
-                break
+        for line in lines:
+            if line.endswith(b"\r"):
+                line = line[:-1]
+
+            if not line:
+                continue
+
+            name, value = line.split(b":", 1)
+            headers[self._decode_name(name)] = self._decode_header(value)
         return headers
 
-    def build_frame(
-        self,
-        command: str,
-        headers: Optional[Dict[str, Any]] = None,
-        body: Union[bytes, str] = "",
+    def build_frame_prefix(
+        self, command: str, headers: Optional[Dict[str, Any]] = None
     ) -> bytes:
-        lines: List[Union[str, bytes]] = [command, "\n"]
+        lines: List[str] = [command, "\n"]
 
         if headers:
             for key, value in sorted(headers.items()):
                 lines.append(f"{key}:{self._encode_header(value)}\n")
 
         lines.append("\n")
-        lines.append(body)
-        lines.append(self.EOF)
 
-        return b"".join(self._encode(line) for line in lines)
+        return "".join(lines).encode("utf-8")
+
+    def build_frame_parts(
+        self,
+        command: str,
+        headers: Optional[Dict[str, Any]] = None,
+        body: Body = "",
+    ) -> List[BytesLike]:
+        # The body is passed along as is, so the caller can hand the parts
+        # to a scatter write without copying the payload.
+        return [self.build_frame_prefix(command, headers), self._encode(body), self.EOF]
+
+    def build_frame(
+        self,
+        command: str,
+        headers: Optional[Dict[str, Any]] = None,
+        body: Body = "",
+    ) -> bytes:
+        return b"".join(self.build_frame_parts(command, headers, body))
 
     def pop_frames(self) -> List[Frame]:
         frames = self._frames_ready
         self._frames_ready = []
 
         return frames
-
-
-def ends_with_crlf(data: Deque[int]) -> bool:
-    size = len(data)
-    ending = list(itertools.islice(data, size - 4, size))
-
-    return ending == StompProtocol.CRLFCRLR
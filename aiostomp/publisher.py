@@ -0,0 +1,93 @@
+import asyncio
+from typing import Any, Dict, Optional, Set, TYPE_CHECKING, cast
+
+from aiostomp.protocol import Body
+
+if TYPE_CHECKING:
+    from aiostomp.aiostomp import AioStomp
+
+
+class WindowedPublisher:
+    """Publishes with receipts, keeping up to `window` sends unconfirmed.
+
+    `send()` returns as soon as the message is written, unless `window`
+    messages are already waiting for their RECEIPT, in which case it
+    waits for one of them first. `flush()` waits for every outstanding
+    receipt and raises the first error any of them failed with.
+    """
+
+    def __init__(self, client: "AioStomp", window: int = 100):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+
+        self.window = window
+        self.confirmed = 0
+        self.failed = 0
+
+        self._client = client
+        self._pending: Set[asyncio.Future] = set()
+        # Sends that hold a slot but are still being written
+        self._sending = 0
+        self._slot: Optional[asyncio.Future] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending) + self._sending
+
+    async def send(
+        self,
+        destination: str,
+        body: Body = "",
+        headers: Optional[Dict[str, Any]] = None,
+        send_content_length=True,
+    ) -> asyncio.Future:
+        while self.in_flight >= self.window:
+            if self._slot is None:
+                self._slot = asyncio.get_event_loop().create_future()
+            await asyncio.shield(self._slot)
+
+        self._sending += 1
+        try:
+            future = cast(
+                asyncio.Future,
+                await self._client.send_async(
+                    destination, body, headers, send_content_length, receipt=True
+                ),
+            )
+        except BaseException:
+            self._sending -= 1
+            self._release_slot()
+            raise
+
+        self._sending -= 1
+        self._pending.add(future)
+        future.add_done_callback(self._on_receipt)
+        return future
+
+    def _on_receipt(self, future: asyncio.Future) -> None:
+        self._pending.discard(future)
+
+        if future.cancelled():
+            self.failed += 1
+        elif future.exception() is not None:
+            self.failed += 1
+            if self._error is None:
+                self._error = future.exception()
+        else:
+            self.confirmed += 1
+
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        if self._slot is not None and not self._slot.done():
+            self._slot.set_result(None)
+        self._slot = None
+
+    async def flush(self) -> None:
+        if self._pending:
+            await asyncio.wait(list(self._pending))
+
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
@@ -10,6 +10,11 @@ class Subscription:
         extra_headers: Dict[str, str],
         handler: Any,
         auto_ack: bool = True,
+        body_view: bool = False,
+        concurrency: int = 1,
+        batch_handler: Any = None,
+        max_batch: int = 100,
+        max_wait_ms: int = 50,
     ):
         self.destination = destination
         self.id = id
@@ -17,3 +22,8 @@ class Subscription:
         self.extra_headers = extra_headers
         self.handler = handler
         self.auto_ack: bool = auto_ack
+        self.body_view = body_view
+        self.concurrency = concurrency
+        self.batch_handler = batch_handler
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
@@ -0,0 +1,188 @@
+import asyncio
+from typing import Any, Dict, Optional, Set, TYPE_CHECKING
+
+from aiostomp.protocol import Body, Frame
+
+if TYPE_CHECKING:
+    from aiostomp.aiostomp import AioStomp
+
+
+class Transaction:
+    """A STOMP transaction: messages sent and acked through it take effect on commit.
+
+    Use it as an async context manager to begin it on entry, commit it
+    on a clean exit and abort it if the block raises. With `receipt`
+    set, `commit()` waits until the broker has confirmed the commit.
+    """
+
+    def __init__(self, client: "AioStomp", id: str, receipt: bool = True):
+        self.id = id
+        self.receipt = receipt
+        self.messages = 0
+
+        self._client = client
+        self._begun = False
+        self._finished = False
+
+    @property
+    def open(self) -> bool:
+        return self._begun and not self._finished
+
+    def begin(self) -> None:
+        if self._begun:
+            raise RuntimeError(f"Transaction {self.id} already begun")
+
+        self._client.begin(self.id)
+        self._begun = True
+
+    def _check_open(self) -> None:
+        if not self._begun:
+            raise RuntimeError(f"Transaction {self.id} not begun")
+
+        if self._finished:
+            raise RuntimeError(f"Transaction {self.id} already finished")
+
+    def send(
+        self,
+        destination: str,
+        body: Body = "",
+        headers: Optional[Dict[str, Any]] = None,
+        send_content_length=True,
+    ) -> None:
+        self._check_open()
+
+        headers = dict(headers) if headers else {}
+        headers["transaction"] = self.id
+
+        self._client.send(destination, body, headers, send_content_length)
+        self.messages += 1
+
+    def ack(self, frame: Frame) -> None:
+        self._check_open()
+        self._client.ack(frame, transaction=self.id)
+
+    def nack(self, frame: Frame) -> None:
+        self._check_open()
+        self._client.nack(frame, transaction=self.id)
+
+    async def commit(self) -> None:
+        self._check_open()
+        self._finished = True
+
+        future = self._client.commit(self.id, receipt=self.receipt)
+        if future is not None:
+            await future
+
+    def abort(self) -> None:
+        self._check_open()
+        self._finished = True
+
+        self._client.abort(self.id)
+
+    async def __aenter__(self) -> "Transaction":
+        self.begin()
+        return self
+
+    async def __aexit__(self, exc_type: type, exc_value: Exception, exc_traceback: Any) -> None:
+        if self._finished:
+            return
+
+        if exc_type is None:
+            await self.commit()
+        else:
+            self.abort()
+
+
+class BatchingPublisher:
+    """Publishes in transactions of up to `max_messages` messages.
+
+    A transaction is begun with the first message and committed once it
+    holds `max_messages` messages, or `max_wait_ms` after it was begun.
+    `send()` waits for a commit it triggers. Errors of commits triggered
+    by the timer are raised by the next `send()` or `flush()`.
+    """
+
+    def __init__(
+        self,
+        client: "AioStomp",
+        max_messages: int = 100,
+        max_wait_ms: int = 100,
+        receipt: bool = True,
+    ):
+        if max_messages < 1:
+            raise ValueError("max_messages must be at least 1")
+
+        self.max_messages = max_messages
+        self.max_wait_ms = max_wait_ms
+        self.receipt = receipt
+        self.committed = 0
+
+        self._client = client
+        self._transaction: Optional[Transaction] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._commits: Set[asyncio.Task] = set()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def pending(self) -> int:
+        return self._transaction.messages if self._transaction else 0
+
+    def _raise_error(self) -> None:
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    async def send(
+        self,
+        destination: str,
+        body: Body = "",
+        headers: Optional[Dict[str, Any]] = None,
+        send_content_length=True,
+    ) -> None:
+        self._raise_error()
+
+        if self._transaction is None:
+            self._transaction = self._client.transaction(receipt=self.receipt)
+            self._transaction.begin()
+            self._timer = asyncio.get_event_loop().call_later(
+                self.max_wait_ms / 1000.0, self._commit_later
+            )
+
+        self._transaction.send(destination, body, headers, send_content_length)
+        await self._client.drain()
+
+        if self._transaction.messages >= self.max_messages:
+            await self.commit()
+
+    async def commit(self) -> None:
+        transaction, self._transaction = self._transaction, None
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if transaction is not None:
+            await transaction.commit()
+            self.committed += transaction.messages
+
+    def _commit_later(self) -> None:
+        self._timer = None
+
+        task = asyncio.ensure_future(self.commit())
+        self._commits.add(task)
+        task.add_done_callback(self._on_commit)
+
+    def _on_commit(self, task: asyncio.Task) -> None:
+        self._commits.discard(task)
+
+        if not task.cancelled() and task.exception() is not None:
+            if self._error is None:
+                self._error = task.exception()
+
+    async def flush(self) -> None:
+        await self.commit()
+
+        if self._commits:
+            await asyncio.wait(list(self._commits))
+
+        self._raise_error()
@@ -48,6 +48,18 @@ def get_parameters(args):
         default=DEFAULT_MESSAGE_SIZE,
         help="Message size [default: %(default)s].")
 
+    parser.add_argument(
+        '-b',
+        type=int,
+        default=1,
+        help="Messages sent per event loop iteration [default: %(default)s].")
+
+    parser.add_argument(
+        '--body-type',
+        choices=['str', 'bytes', 'bytearray', 'memoryview'],
+        default='str',
+        help="Type of the body handed to send [default: %(default)s].")
+
     parser.add_argument(
         '-csv',
         type=str,
@@ -275,16 +287,33 @@ async def create_connection(address, client_id):
     return client
 
 
-async def run_publish(client, bench, message_size, num_msgs, queue):
-
-    msg = ''.join([
+def build_message(message_size, body_type='str'):
+    # Repeat a random block so multi-megabyte messages are cheap to build
+    block = ''.join([
         random.choice(string.printable)
-        for n in range(message_size)])
+        for n in range(min(message_size, 4096))])
+
+    msg = (block * (message_size // len(block) + 1))[:message_size]
+
+    if body_type == 'bytes':
+        return msg.encode()
+    if body_type == 'bytearray':
+        return bytearray(msg.encode())
+    if body_type == 'memoryview':
+        return memoryview(msg.encode())
+
+    return msg
+
+
+async def run_publish(client, bench, message_size, num_msgs, queue, body_type='str', burst=1):
+
+    msg = build_message(message_size, body_type)
 
     start = timer()
     for n in range(num_msgs):
         client.send(queue, msg)
-        await asyncio.sleep(0)
+        if (n + 1) % burst == 0:
+            await asyncio.sleep(0)
 
     end = timer()
     bench.add_sample('publish', Sample(num_msgs, message_size, start, end))
@@ -389,7 +418,8 @@ async def run_benchmark(params):
 
     for i, client in enumerate(publishers):
         tasks.append(
-            run_publish(client, bench, params.ms, pub_messages[i], params.queue))
+            run_publish(client, bench, params.ms, pub_messages[i], params.queue,
+                        params.body_type, params.b))
 
     await asyncio.gather(*tasks)
 
@@ -0,0 +1,126 @@
+import sys
+import asyncio
+import argparse
+
+from timeit import default_timer as timer
+
+from aiostomp.aiostomp import StompReader
+from aiostomp.subscription import Subscription
+
+from bench import human_bytes
+from bench_dispatch import FrameHandler
+from bench_parser import build_stream, split
+
+
+DEFAULT_NUM_MSGS = 100000
+DEFAULT_MESSAGE_SIZE = 128
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def get_parameters(args):
+    parser = argparse.ArgumentParser(description='AioStomp Ack Benchmark')
+
+    parser.add_argument(
+        '-n',
+        type=int,
+        default=DEFAULT_NUM_MSGS,
+        help="Number of messages [default: %(default)s].")
+
+    parser.add_argument(
+        '-ms',
+        type=int,
+        default=DEFAULT_MESSAGE_SIZE,
+        help="Message size [default: %(default)s].")
+
+    parser.add_argument(
+        '-a',
+        choices=['client', 'client-individual'],
+        default='client-individual',
+        help="Ack mode of the subscription [default: %(default)s].")
+
+    parser.add_argument(
+        '-i',
+        type=int,
+        default=None,
+        help="Ack flush interval in ms, acks are not coalesced if unset [default: %(default)s].")
+
+    parser.add_argument(
+        '-s',
+        type=int,
+        default=100,
+        help="Flush after this many pending acks [default: %(default)s].")
+
+    return parser.parse_args(args)
+
+
+class CountingTransport:
+    def __init__(self):
+        self.writes = 0
+        self.bytes = 0
+
+    def write(self, data):
+        self.writes += 1
+        self.bytes += len(data)
+
+    def writelines(self, parts):
+        self.write(b''.join(parts))
+
+    def close(self):
+        pass
+
+
+async def run(params):
+    loop = asyncio.get_event_loop()
+    done = loop.create_future()
+    handled = 0
+
+    async def handler(frame, body):
+        nonlocal handled
+        handled += 1
+        if handled == params.n:
+            done.set_result(None)
+        return True
+
+    subscription = Subscription('/queue/bench', 1, params.a, {}, handler)
+
+    stomp = StompReader(
+        FrameHandler(subscription), loop,
+        ack_flush_interval_ms=params.i, ack_flush_size=params.s)
+    transport = CountingTransport()
+    stomp._transport = transport
+
+    chunks = split(build_stream(params.n, params.ms), DEFAULT_CHUNK_SIZE)
+
+    start = timer()
+    for chunk in chunks:
+        stomp.data_received(chunk)
+        await asyncio.sleep(0)
+
+    await done
+    stomp.close()
+    end = timer()
+
+    stomp.connection_lost(None)
+    await asyncio.sleep(0.01)
+
+    return end - start, transport
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    params = get_parameters(args)
+
+    duration, transport = asyncio.get_event_loop().run_until_complete(run(params))
+
+    print('== AioStomp Ack Benchmark ==')
+    print(' {} msgs, ack mode {}, coalescing: {}'.format(
+        params.n, params.a,
+        '{}ms / {} acks'.format(params.i, params.s) if params.i is not None else 'off'))
+    print('  {:.2f} msgs/sec, {} writes, {} of acks'.format(
+        params.n / duration, transport.writes, human_bytes(transport.bytes)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,135 @@
+import sys
+import asyncio
+import argparse
+
+from timeit import default_timer as timer
+
+from aiostomp.aiostomp import AioStomp
+
+from bench import human_bytes
+
+
+DEFAULT_NUM_MSGS = 20000
+DEFAULT_MESSAGE_SIZE = 1024
+DEFAULT_READ_RATE = 8 * 1024 * 1024
+
+
+def get_parameters(args):
+    parser = argparse.ArgumentParser(description='AioStomp Backpressure Benchmark')
+
+    parser.add_argument(
+        '-n',
+        type=int,
+        default=DEFAULT_NUM_MSGS,
+        help="Number of messages to send [default: %(default)s].")
+
+    parser.add_argument(
+        '-ms',
+        type=int,
+        default=DEFAULT_MESSAGE_SIZE,
+        help="Message size [default: %(default)s].")
+
+    parser.add_argument(
+        '-r',
+        type=int,
+        default=DEFAULT_READ_RATE,
+        help="Bytes per second read by the slow broker [default: %(default)s].")
+
+    parser.add_argument(
+        '--high',
+        type=int,
+        default=None,
+        help="Write buffer high-water mark [default: transport default].")
+
+    parser.add_argument(
+        '--sync',
+        default=False,
+        action='store_true',
+        help="Publish with send instead of send_async [default: %(default)s].")
+
+    return parser.parse_args(args)
+
+
+class SlowBroker(asyncio.Protocol):
+    # Reads at most `rate` bytes per second, like a broker that can't keep up
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.loop = asyncio.get_event_loop()
+        self.tick = 0.01
+        self.budget = self.rate * self.tick
+        self.read = 0
+        self.handle = self.loop.call_later(self.tick, self.refill)
+
+    def refill(self):
+        self.read = 0
+        self.transport.resume_reading()
+        self.handle = self.loop.call_later(self.tick, self.refill)
+
+    def data_received(self, data):
+        self.read += len(data)
+        if self.read >= self.budget:
+            self.transport.pause_reading()
+
+    def connection_lost(self, exc):
+        self.handle.cancel()
+
+
+async def publish(params, port):
+    client = AioStomp('127.0.0.1', port, heartbeat=False, write_buffer_high=params.high)
+    await client.connect()
+
+    transport = client._protocol._protocol._transport
+    body = b'x' * params.ms
+    peak = 0
+
+    start = timer()
+    for n in range(params.n):
+        if params.sync:
+            client.send('/queue/bench', body)
+            if n % 100 == 0:
+                await asyncio.sleep(0)
+        else:
+            await client.send_async('/queue/bench', body)
+
+        peak = max(peak, transport.get_write_buffer_size())
+    end = timer()
+
+    client.close()
+    return end - start, peak
+
+
+async def run(params):
+    loop = asyncio.get_event_loop()
+
+    server = await loop.create_server(lambda: SlowBroker(params.r), '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+
+    duration, peak = await publish(params, port)
+
+    server.close()
+    await server.wait_closed()
+
+    print('== AioStomp Backpressure Benchmark ==')
+    print(' {} msgs of {}, broker reads {}/sec, {}'.format(
+        params.n, human_bytes(params.ms), human_bytes(params.r),
+        'send' if params.sync else 'send_async'))
+    print('  publish loop: {:.2f}s ({:.2f} msgs/sec)'.format(duration, params.n / duration))
+    print('  peak transport buffer: {}'.format(human_bytes(peak)))
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    params = get_parameters(args)
+
+    asyncio.get_event_loop().run_until_complete(run(params))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
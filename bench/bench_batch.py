@@ -0,0 +1,132 @@
+import sys
+import asyncio
+import argparse
+
+from timeit import default_timer as timer
+
+from aiostomp.aiostomp import StompReader
+from aiostomp.subscription import Subscription
+
+from bench import human_bytes
+from bench_dispatch import FrameHandler
+from bench_parser import build_stream, split
+
+
+DEFAULT_NUM_MSGS = 20000
+DEFAULT_MESSAGE_SIZE = 128
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def get_parameters(args):
+    parser = argparse.ArgumentParser(description='AioStomp Batch Handler Benchmark')
+
+    parser.add_argument(
+        '-n',
+        type=int,
+        default=DEFAULT_NUM_MSGS,
+        help="Number of messages [default: %(default)s].")
+
+    parser.add_argument(
+        '-ms',
+        type=int,
+        default=DEFAULT_MESSAGE_SIZE,
+        help="Message size [default: %(default)s].")
+
+    parser.add_argument(
+        '-b',
+        type=int,
+        default=0,
+        help="max_batch of the batch handler, 0 uses a per-message handler [default: %(default)s].")
+
+    parser.add_argument(
+        '-c',
+        type=int,
+        default=1,
+        help="Handler concurrency [default: %(default)s].")
+
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=2.0,
+        help="Sink round trip per call, in ms [default: %(default)s].")
+
+    parser.add_argument(
+        '--row-cost',
+        type=float,
+        default=10.0,
+        help="Sink cost per row, in us [default: %(default)s].")
+
+    return parser.parse_args(args)
+
+
+class SlowSink:
+    # A database: one round trip per insert call plus a small cost per row
+
+    def __init__(self, latency, row_cost):
+        self.latency = latency / 1000.0
+        self.row_cost = row_cost / 1000000.0
+        self.rows = 0
+
+    async def insert(self, rows):
+        await asyncio.sleep(self.latency + self.row_cost * len(rows))
+        self.rows += len(rows)
+
+
+async def run(params):
+    loop = asyncio.get_event_loop()
+    done = loop.create_future()
+    sink = SlowSink(params.latency, params.row_cost)
+
+    def check_done():
+        if sink.rows == params.n and not done.done():
+            done.set_result(None)
+
+    async def handler(frame, body):
+        await sink.insert([body])
+        check_done()
+
+    async def batch_handler(frames):
+        await sink.insert([frame.body for frame in frames])
+        check_done()
+
+    if params.b:
+        subscription = Subscription(
+            '/queue/bench', 1, 'auto', {}, None, concurrency=params.c,
+            batch_handler=batch_handler, max_batch=params.b)
+    else:
+        subscription = Subscription(
+            '/queue/bench', 1, 'auto', {}, handler, concurrency=params.c)
+
+    stomp = StompReader(FrameHandler(subscription), loop)
+    chunks = split(build_stream(params.n, params.ms), DEFAULT_CHUNK_SIZE)
+
+    start = timer()
+    for chunk in chunks:
+        stomp.data_received(chunk)
+
+    await done
+    end = timer()
+
+    stomp.connection_lost(None)
+    await asyncio.sleep(0.01)
+
+    return end - start
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    params = get_parameters(args)
+
+    duration = asyncio.get_event_loop().run_until_complete(run(params))
+
+    print('== AioStomp Batch Handler Benchmark ==')
+    print(' {} msgs of {}, sink: {}ms per call + {}us per row, concurrency {}, {}'.format(
+        params.n, human_bytes(params.ms), params.latency, params.row_cost, params.c,
+        'max_batch {}'.format(params.b) if params.b else 'per-message handler'))
+    print('  {:.2f} msgs/sec'.format(params.n / duration))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,126 @@
+import sys
+import gc
+import asyncio
+import argparse
+import tracemalloc
+
+from timeit import default_timer as timer
+
+from aiostomp.aiostomp import StompReader
+from aiostomp.subscription import Subscription
+
+from bench import human_bytes
+from bench_parser import build_stream, split
+
+
+DEFAULT_NUM_MSGS = 100000
+DEFAULT_MESSAGE_SIZE = 128
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def get_parameters(args):
+    parser = argparse.ArgumentParser(description='AioStomp Dispatch Benchmark')
+
+    parser.add_argument(
+        '-n',
+        type=int,
+        default=DEFAULT_NUM_MSGS,
+        help="Number of messages received in one burst [default: %(default)s].")
+
+    parser.add_argument(
+        '-ms',
+        type=int,
+        default=DEFAULT_MESSAGE_SIZE,
+        help="Message size [default: %(default)s].")
+
+    parser.add_argument(
+        '-c',
+        type=int,
+        default=1,
+        help="Handler concurrency of the subscription [default: %(default)s].")
+
+    parser.add_argument(
+        '--io',
+        default=False,
+        action='store_true',
+        help="Handler yields to the loop once, like awaiting I/O [default: %(default)s].")
+
+    return parser.parse_args(args)
+
+
+class FrameHandler:
+    # Just enough of AioStomp for StompReader to dispatch messages
+
+    def __init__(self, subscription):
+        self.subscription = subscription
+        self._on_error = None
+
+    def get(self, key):
+        return self.subscription
+
+    def connection_lost(self, exc):
+        pass
+
+
+async def run(params, trace=False):
+    loop = asyncio.get_event_loop()
+    done = loop.create_future()
+    handled = 0
+
+    async def handler(frame, body):
+        nonlocal handled
+        if params.io:
+            await asyncio.sleep(0)
+
+        handled += 1
+        if handled == params.n:
+            done.set_result(None)
+
+    subscription = Subscription('/queue/bench', 1, 'auto', {}, handler)
+    subscription.concurrency = params.c
+
+    stomp = StompReader(FrameHandler(subscription), loop)
+    chunks = split(build_stream(params.n, params.ms), DEFAULT_CHUNK_SIZE)
+
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+
+    start = timer()
+    for chunk in chunks:
+        stomp.data_received(chunk)
+
+    await done
+    end = timer()
+
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+
+    # Let idle workers exit
+    stomp.connection_lost(None)
+    await asyncio.sleep(0.01)
+
+    return end - start, peak
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    params = get_parameters(args)
+
+    loop = asyncio.get_event_loop()
+    duration, _ = loop.run_until_complete(run(params))
+    _, peak = loop.run_until_complete(run(params, trace=True))
+
+    print('== AioStomp Dispatch Benchmark ==')
+    print(' {} msgs of {} in one burst, concurrency {}, handler does I/O: {}'.format(
+        params.n, human_bytes(params.ms), params.c, params.io))
+    print('  {:.2f} msgs/sec, peak memory {}'.format(params.n / duration, human_bytes(peak)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
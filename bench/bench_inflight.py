@@ -0,0 +1,153 @@
+import sys
+import gc
+import asyncio
+import argparse
+import tracemalloc
+
+from timeit import default_timer as timer
+
+from aiostomp.aiostomp import AioStomp
+from aiostomp.protocol import StompProtocol
+
+from bench import human_bytes
+
+
+DEFAULT_NUM_MSGS = 50000
+DEFAULT_MESSAGE_SIZE = 1024
+
+
+def get_parameters(args):
+    parser = argparse.ArgumentParser(description='AioStomp In-flight Budget Benchmark')
+
+    parser.add_argument(
+        '-n',
+        type=int,
+        default=DEFAULT_NUM_MSGS,
+        help="Number of messages pushed by the broker [default: %(default)s].")
+
+    parser.add_argument(
+        '-ms',
+        type=int,
+        default=DEFAULT_MESSAGE_SIZE,
+        help="Message size [default: %(default)s].")
+
+    parser.add_argument(
+        '--max-messages',
+        type=int,
+        default=None,
+        help="Max in-flight messages [default: unlimited].")
+
+    parser.add_argument(
+        '--max-bytes',
+        type=int,
+        default=None,
+        help="Max in-flight body bytes [default: unlimited].")
+
+    return parser.parse_args(args)
+
+
+class FastBroker(asyncio.Protocol):
+    # Pushes messages as fast as the client reads them, honouring
+    # its own write buffer limits like a broker with a prefetch window
+
+    def __init__(self, num_msgs, message_size):
+        protocol = StompProtocol()
+        self.frame = protocol.build_frame('MESSAGE', {
+            'subscription': '1',
+            'message-id': 'ID:bench',
+            'destination': '/queue/bench',
+            'content-length': message_size,
+        }, b'x' * message_size)
+        self.remaining = num_msgs
+        self.paused = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.loop = asyncio.get_event_loop()
+        self.loop.call_soon(self.push)
+
+    def push(self):
+        while self.remaining and not self.paused:
+            batch = min(self.remaining, 64)
+            self.transport.write(self.frame * batch)
+            self.remaining -= batch
+
+    def pause_writing(self):
+        self.paused = True
+
+    def resume_writing(self):
+        self.paused = False
+        self.loop.call_soon(self.push)
+
+
+async def run(params, port):
+    loop = asyncio.get_event_loop()
+    done = loop.create_future()
+    handled = 0
+
+    async def handler(frame, body):
+        nonlocal handled
+
+        # Slower than the socket
+        for _ in range(4):
+            await asyncio.sleep(0)
+
+        handled += 1
+        if handled == params.n:
+            done.set_result(None)
+
+    client = AioStomp(
+        '127.0.0.1', port, heartbeat=False,
+        max_inflight_messages=params.max_messages,
+        max_inflight_bytes=params.max_bytes)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    client.subscribe('/queue/bench', handler=handler, concurrency=4)
+
+    start = timer()
+    await client.connect()
+    await done
+    end = timer()
+
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    paused = client.read_paused_time
+    client.close()
+
+    return end - start, peak, paused
+
+
+async def main_async(params):
+    loop = asyncio.get_event_loop()
+
+    server = await loop.create_server(
+        lambda: FastBroker(params.n, params.ms), '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+
+    duration, peak, paused = await run(params, port)
+
+    server.close()
+    await server.wait_closed()
+
+    print('== AioStomp In-flight Budget Benchmark ==')
+    print(' {} msgs of {}, max in-flight messages: {}, bytes: {}'.format(
+        params.n, human_bytes(params.ms), params.max_messages, params.max_bytes))
+    print('  {:.2f} msgs/sec, peak memory {}, reading paused {:.2f}s'.format(
+        params.n / duration, human_bytes(peak), paused))
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    params = get_parameters(args)
+
+    asyncio.get_event_loop().run_until_complete(main_async(params))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,98 @@
+import sys
+import gc
+import argparse
+import tracemalloc
+
+from aiostomp.protocol import StompProtocol
+
+from bench import human_bytes
+from bench_parser import build_stream, split
+
+
+DEFAULT_NUM_FRAMES = 20000
+DEFAULT_MESSAGE_SIZE = 128
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def get_parameters(args):
+    parser = argparse.ArgumentParser(description='AioStomp Memory Benchmark')
+
+    parser.add_argument(
+        '-n',
+        type=int,
+        default=DEFAULT_NUM_FRAMES,
+        help="Number of frames to keep buffered [default: %(default)s].")
+
+    parser.add_argument(
+        '-ms',
+        type=int,
+        default=DEFAULT_MESSAGE_SIZE,
+        help="Message size [default: %(default)s].")
+
+    parser.add_argument(
+        '-nh',
+        type=int,
+        default=0,
+        help="Number of extra custom headers per frame [default: %(default)s].")
+
+    parser.add_argument(
+        '--lazy-headers',
+        default=False,
+        action='store_true',
+        help="Decode headers on first access [default: %(default)s].")
+
+    parser.add_argument(
+        '--body-view',
+        default=False,
+        action='store_true',
+        help="Deliver bodies as memoryviews [default: %(default)s].")
+
+    return parser.parse_args(args)
+
+
+def measure_frames(chunks, lazy_headers, body_view=False):
+    protocol = StompProtocol(lazy_headers=lazy_headers)
+    if body_view:
+        protocol.body_view_filter = lambda headers: True
+    buffered = []
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    for chunk in chunks:
+        protocol.feed_data(chunk)
+        for frame in protocol.pop_frames():
+            # Like a handler backlog: only messages stay around, each one
+            # after the client has looked up its subscription.
+            if frame.command == 'MESSAGE':
+                frame.headers.get('subscription')
+                buffered.append(frame)
+
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return buffered, after - before, peak - before
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    params = get_parameters(args)
+
+    data = build_stream(params.n, params.ms, extra_headers=params.nh)
+    chunks = split(data, DEFAULT_CHUNK_SIZE)
+
+    frames, used, peak = measure_frames(chunks, params.lazy_headers, params.body_view)
+
+    print('== AioStomp Memory Benchmark ==')
+    print(' {} frames, {} body, {} extra headers, lazy headers: {}, body view: {}'.format(
+        params.n, human_bytes(params.ms), params.nh, params.lazy_headers, params.body_view))
+    print('  total: {} (peak {})'.format(human_bytes(used), human_bytes(peak)))
+    print('  per buffered frame: {:.0f} B ({:.0f} B overhead over the body)'.format(
+        used / len(frames), used / len(frames) - params.ms))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,156 @@
+import sys
+import argparse
+
+from timeit import default_timer as timer
+
+from aiostomp.protocol import StompProtocol
+
+from bench import human_bytes
+
+
+DEFAULT_NUM_FRAMES = 20000
+DEFAULT_MESSAGE_SIZE = 128
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_REPEAT = 3
+
+
+def get_parameters(args):
+    parser = argparse.ArgumentParser(description='AioStomp Parser Benchmark')
+
+    parser.add_argument(
+        '-n',
+        type=int,
+        default=DEFAULT_NUM_FRAMES,
+        help="Number of frames to parse [default: %(default)s].")
+
+    parser.add_argument(
+        '-ms',
+        type=int,
+        default=DEFAULT_MESSAGE_SIZE,
+        help="Message size [default: %(default)s].")
+
+    parser.add_argument(
+        '-nh',
+        type=int,
+        default=0,
+        help="Number of extra custom headers per frame [default: %(default)s].")
+
+    parser.add_argument(
+        '-c',
+        type=int,
+        nargs='+',
+        default=[DEFAULT_CHUNK_SIZE],
+        help="Size of each chunk fed to the parser [default: %(default)s].")
+
+    parser.add_argument(
+        '-r',
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="Number of runs, best one is reported [default: %(default)s].")
+
+    parser.add_argument(
+        '--no-content-length',
+        default=False,
+        action='store_true',
+        help="Omit the content-length header [default: %(default)s].")
+
+    parser.add_argument(
+        '--lazy-headers',
+        default=False,
+        action='store_true',
+        help="Decode headers on first access [default: %(default)s].")
+
+    parser.add_argument(
+        '--body-view',
+        default=False,
+        action='store_true',
+        help="Deliver bodies as memoryviews [default: %(default)s].")
+
+    return parser.parse_args(args)
+
+
+def build_stream(num_frames, message_size, content_length=True, extra_headers=0):
+    protocol = StompProtocol()
+    body = b'x' * message_size
+
+    custom = {
+        'x-custom-header-{}'.format(h): 'custom-value-{}'.format(h)
+        for h in range(extra_headers)
+    }
+
+    frames = []
+    for n in range(num_frames):
+        headers = {
+            'destination': '/queue/bench',
+            'subscription': '1',
+            'message-id': 'ID:bench-35207-1543430467768-204:363:-1:1:{}'.format(n),
+            'expires': '0',
+            'priority': '4',
+            'persistent': 'true',
+            'timestamp': '1548945234003',
+        }
+        headers.update(custom)
+        if content_length:
+            headers['content-length'] = message_size
+
+        frames.append(protocol.build_frame('MESSAGE', headers, body))
+
+        # Sprinkle heartbeats between frames like a real broker would
+        if n % 100 == 0:
+            frames.append(b'\n')
+
+    return b''.join(frames)
+
+
+def split(data, chunk_size):
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def run(chunks, expected, lazy_headers=False, body_view=False):
+    protocol = StompProtocol(lazy_headers=lazy_headers)
+    if body_view:
+        protocol.body_view_filter = lambda headers: True
+
+    start = timer()
+    received = 0
+    for chunk in chunks:
+        protocol.feed_data(chunk)
+        for frame in protocol.pop_frames():
+            # What the client itself reads before dispatching and acking
+            frame.headers.get('subscription')
+            frame.headers.get('message-id')
+            received += 1
+    end = timer()
+
+    assert received == expected, (received, expected)
+    return end - start
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    params = get_parameters(args)
+
+    data = build_stream(params.n, params.ms, not params.no_content_length, params.nh)
+    expected = params.n + (params.n + 99) // 100
+
+    print('== AioStomp Parser Benchmark ==')
+    print(' {} frames, {} body, {} extra headers, {} stream'.format(
+        params.n, human_bytes(params.ms), params.nh, human_bytes(len(data))))
+
+    for chunk_size in params.c:
+        chunks = split(data, chunk_size)
+        duration = min(
+            run(chunks, expected, params.lazy_headers, params.body_view)
+            for r in range(params.r))
+
+        print('  chunk {:>10}: {:>12.2f} frames/sec ~ {}/sec ({:.1f} ns/byte)'.format(
+            human_bytes(chunk_size),
+            params.n / duration,
+            human_bytes(len(data) / duration),
+            duration * 1e9 / len(data)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
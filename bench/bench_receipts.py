@@ -0,0 +1,94 @@
+import sys
+import asyncio
+import argparse
+
+from timeit import default_timer as timer
+
+from aiostomp.aiostomp import AioStomp
+
+from bench import human_bytes
+from stub_broker import start_broker
+
+
+DEFAULT_NUM_MSGS = 20000
+DEFAULT_MESSAGE_SIZE = 128
+DEFAULT_WINDOWS = [1, 10, 100, 1000]
+
+
+def get_parameters(args):
+    parser = argparse.ArgumentParser(description='AioStomp Confirmed Publish Benchmark')
+
+    parser.add_argument(
+        '-n',
+        type=int,
+        default=DEFAULT_NUM_MSGS,
+        help="Number of messages per window size [default: %(default)s].")
+
+    parser.add_argument(
+        '-ms',
+        type=int,
+        default=DEFAULT_MESSAGE_SIZE,
+        help="Message size [default: %(default)s].")
+
+    parser.add_argument(
+        '-w',
+        type=int,
+        nargs='+',
+        default=DEFAULT_WINDOWS,
+        help="Publisher window sizes [default: %(default)s].")
+
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=1.0,
+        help="Time the broker takes to confirm a message, in ms [default: %(default)s].")
+
+    return parser.parse_args(args)
+
+
+async def run(params, port, window):
+    client = AioStomp('127.0.0.1', port, heartbeat=False)
+    await client.connect()
+
+    publisher = client.windowed_publisher(window=window)
+    body = b'x' * params.ms
+
+    # Fewer messages for the small windows, they take a round trip each
+    num_msgs = min(params.n, max(window * 200, 1000))
+
+    start = timer()
+    for n in range(num_msgs):
+        await publisher.send('/queue/bench', body)
+    await publisher.flush()
+    end = timer()
+
+    client.close()
+    return num_msgs, end - start
+
+
+async def main_async(params):
+    server, port = await start_broker(receipt_latency=params.latency / 1000.0)
+
+    print('== AioStomp Confirmed Publish Benchmark ==')
+    print(' {} body, broker confirms after {}ms'.format(human_bytes(params.ms), params.latency))
+
+    for window in params.w:
+        num_msgs, duration = await run(params, port, window)
+        print('  window {:>6}: {:>10.2f} confirmed msgs/sec ({} msgs)'.format(
+            window, num_msgs / duration, num_msgs))
+
+    server.close()
+    await server.wait_closed()
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    params = get_parameters(args)
+
+    asyncio.get_event_loop().run_until_complete(main_async(params))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
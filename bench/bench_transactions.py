@@ -0,0 +1,116 @@
+import sys
+import asyncio
+import argparse
+
+from timeit import default_timer as timer
+
+from aiostomp.aiostomp import AioStomp
+
+from bench import human_bytes
+from stub_broker import start_broker
+
+
+DEFAULT_NUM_MSGS = 10000
+DEFAULT_MESSAGE_SIZE = 128
+DEFAULT_BATCH_SIZES = [1, 10, 100, 500]
+
+
+def get_parameters(args):
+    parser = argparse.ArgumentParser(description='AioStomp Transactional Publish Benchmark')
+
+    parser.add_argument(
+        '-n',
+        type=int,
+        default=DEFAULT_NUM_MSGS,
+        help="Number of messages per run [default: %(default)s].")
+
+    parser.add_argument(
+        '-ms',
+        type=int,
+        default=DEFAULT_MESSAGE_SIZE,
+        help="Message size [default: %(default)s].")
+
+    parser.add_argument(
+        '-b',
+        type=int,
+        nargs='+',
+        default=DEFAULT_BATCH_SIZES,
+        help="Messages per transaction [default: %(default)s].")
+
+    parser.add_argument(
+        '-w',
+        type=int,
+        default=100,
+        help="Window of the receipt publisher compared against [default: %(default)s].")
+
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0.5,
+        help="Time the broker takes to sync a confirmed frame, in ms [default: %(default)s].")
+
+    return parser.parse_args(args)
+
+
+async def publish(client, publisher, num_msgs, body):
+    start = timer()
+    for n in range(num_msgs):
+        await publisher.send('/queue/bench', body)
+    await publisher.flush()
+    end = timer()
+
+    client.close()
+    return end - start
+
+
+async def run_windowed(params, port, num_msgs):
+    client = AioStomp('127.0.0.1', port, heartbeat=False)
+    await client.connect()
+
+    publisher = client.windowed_publisher(window=params.w)
+    return await publish(client, publisher, num_msgs, b'x' * params.ms)
+
+
+async def run_batching(params, port, num_msgs, batch_size):
+    client = AioStomp('127.0.0.1', port, heartbeat=False)
+    await client.connect()
+
+    publisher = client.batching_publisher(max_messages=batch_size)
+    return await publish(client, publisher, num_msgs, b'x' * params.ms)
+
+
+async def main_async(params):
+    server, port = await start_broker(
+        receipt_latency=params.latency / 1000.0, serial_receipts=True)
+
+    print('== AioStomp Transactional Publish Benchmark ==')
+    print(' {} body, broker syncs each confirmed frame in {}ms'.format(
+        human_bytes(params.ms), params.latency))
+
+    # Every message is synced, the run takes at least n * latency
+    num_msgs = min(params.n, int(2000 / params.latency))
+    duration = await run_windowed(params, port, num_msgs)
+    print('  receipts, window {:>5}: {:>10.2f} confirmed msgs/sec ({} msgs)'.format(
+        params.w, num_msgs / duration, num_msgs))
+
+    for batch_size in params.b:
+        num_msgs = min(params.n, int(batch_size * 2000 / params.latency))
+        duration = await run_batching(params, port, num_msgs, batch_size)
+        print('  transactions of {:>5}: {:>10.2f} confirmed msgs/sec ({} msgs)'.format(
+            batch_size, num_msgs / duration, num_msgs))
+
+    server.close()
+    await server.wait_closed()
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    params = get_parameters(args)
+
+    asyncio.get_event_loop().run_until_complete(main_async(params))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,61 @@
+import asyncio
+
+from aiostomp.protocol import StompProtocol
+
+
+class StubBroker(asyncio.Protocol):
+    # Just enough of a STOMP broker for the benchmarks: answers CONNECT,
+    # counts SENDs and confirms frames carrying a receipt header after
+    # `receipt_latency` seconds, like a broker persisting the message.
+    # With `serial_receipts` the confirmations queue up behind each other,
+    # like a broker syncing one write to disk at a time.
+
+    def __init__(self, receipt_latency=0.0, serial_receipts=False):
+        self.receipt_latency = receipt_latency
+        self.serial_receipts = serial_receipts
+        self.busy_until = 0.0
+        self.parser = StompProtocol()
+        self.transport = None
+        self.sent = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.loop = asyncio.get_event_loop()
+
+    def data_received(self, data):
+        self.parser.feed_data(data)
+
+        for frame in self.parser.pop_frames():
+            self.handle_frame(frame)
+
+    def handle_frame(self, frame):
+        if frame.command == 'CONNECT':
+            self.reply('CONNECTED', {'version': '1.1'})
+        elif frame.command == 'SEND':
+            self.sent += 1
+
+        receipt = frame.headers.get('receipt')
+        if receipt is not None:
+            if self.receipt_latency and self.serial_receipts:
+                self.busy_until = max(self.busy_until, self.loop.time()) + self.receipt_latency
+                self.loop.call_at(self.busy_until, self.confirm, receipt)
+            elif self.receipt_latency:
+                self.loop.call_later(self.receipt_latency, self.confirm, receipt)
+            else:
+                self.confirm(receipt)
+
+    def confirm(self, receipt):
+        self.reply('RECEIPT', {'receipt-id': receipt})
+
+    def reply(self, command, headers, body=b''):
+        if self.transport and not self.transport.is_closing():
+            self.transport.write(self.parser.build_frame(command, headers, body))
+
+
+async def start_broker(factory=StubBroker, **kwargs):
+    loop = asyncio.get_event_loop()
+
+    server = await loop.create_server(lambda: factory(**kwargs), '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+
+    return server, port
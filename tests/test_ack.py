@@ -0,0 +1,135 @@
+import asyncio
+
+from asynctest import Mock
+
+from aiostomp.test_utils import AsyncTestCase, unittest_run_loop
+from aiostomp.aiostomp import AioStompStats
+from aiostomp.ack import AckCoalescer
+
+
+def ack(message_id, subscription="1"):
+    return (("ACK", {"subscription": subscription, "message-id": message_id}),)
+
+
+def nack(message_id, subscription="1"):
+    return (("NACK", {"subscription": subscription, "message-id": message_id}),)
+
+
+class TestAckCoalescer(AsyncTestCase):
+    async def setUpAsync(self):
+        self.send_frame = Mock()
+        self.stats = AioStompStats()
+        self.acks = AckCoalescer(
+            self.send_frame, self.loop, flush_interval=0.01, max_pending=4, stats=self.stats
+        )
+
+    @unittest_run_loop
+    async def test_individual_acks_are_sent_together_after_interval(self):
+        self.acks.ack("1", "a")
+        self.acks.ack("2", "b")
+
+        self.assertEqual(self.acks.pending_acks, 2)
+        self.send_frame.assert_not_called()
+
+        await asyncio.sleep(0.02)
+
+        self.assertEqual(self.send_frame.call_args_list, [ack("a"), ack("b", "2")])
+        self.assertEqual(self.acks.pending_acks, 0)
+        self.assertGreaterEqual(self.acks.last_flush_latency, 0.01)
+        self.assertEqual(self.acks.max_flush_latency, self.acks.last_flush_latency)
+
+    @unittest_run_loop
+    async def test_acks_are_flushed_when_max_pending_is_reached(self):
+        for message_id in "abcd":
+            self.acks.ack("1", message_id)
+
+        self.assertEqual(self.send_frame.call_count, 4)
+        self.assertEqual(self.acks.pending_acks, 0)
+        self.assertIsNone(self.acks._flush_handle)
+
+        self.assertEqual(self.stats.connection_stats[0]["acked"], 4)
+        self.assertEqual(self.stats.connection_stats[0]["ack_frames"], 4)
+
+    @unittest_run_loop
+    async def test_cumulative_ack_covers_handled_messages(self):
+        for message_id in "abc":
+            self.acks.delivered("1", message_id)
+
+        self.acks.ack("1", "a")
+        self.acks.ack("1", "b")
+        self.acks.ack("1", "c")
+        self.acks.flush()
+
+        self.assertEqual(self.send_frame.call_args_list, [ack("c")])
+        self.assertEqual(self.stats.connection_stats[0]["acked"], 3)
+        self.assertEqual(self.stats.connection_stats[0]["ack_frames"], 1)
+
+    @unittest_run_loop
+    async def test_cumulative_ack_waits_for_earlier_messages(self):
+        for message_id in "abc":
+            self.acks.delivered("1", message_id)
+
+        # Handled out of order
+        self.acks.ack("1", "c")
+        self.acks.ack("1", "b")
+
+        self.assertEqual(self.acks.pending_acks, 0)
+        self.acks.flush()
+        self.send_frame.assert_not_called()
+
+        self.acks.ack("1", "a")
+        self.assertEqual(self.acks.pending_acks, 3)
+
+        self.acks.flush()
+        self.assertEqual(self.send_frame.call_args_list, [ack("c")])
+
+    @unittest_run_loop
+    async def test_cumulative_acks_per_subscription(self):
+        self.acks.delivered("1", "a")
+        self.acks.delivered("2", "b")
+
+        self.acks.ack("2", "b")
+        self.acks.ack("1", "a")
+        self.acks.flush()
+
+        self.assertEqual(self.send_frame.call_args_list, [ack("b", "2"), ack("a")])
+
+    @unittest_run_loop
+    async def test_nack_flushes_pending_acks_first(self):
+        for message_id in "abc":
+            self.acks.delivered("1", message_id)
+
+        self.acks.ack("1", "a")
+        self.acks.nack("1", "b")
+
+        self.assertEqual(self.send_frame.call_args_list, [ack("a"), nack("b")])
+
+        self.acks.ack("1", "c")
+        self.acks.flush()
+
+        self.assertEqual(self.send_frame.call_args_list[-1], ack("c"))
+
+    @unittest_run_loop
+    async def test_discarded_message_does_not_hold_back_acks(self):
+        for message_id in "abc":
+            self.acks.delivered("1", message_id)
+
+        self.acks.ack("1", "b")
+        self.acks.discard("1", "a")
+        self.acks.ack("1", "c")
+        self.acks.flush()
+
+        self.assertEqual(self.send_frame.call_args_list, [ack("c")])
+
+    @unittest_run_loop
+    async def test_clear_drops_pending_acks(self):
+        self.acks.delivered("1", "a")
+        self.acks.ack("1", "a")
+        self.acks.ack("1", "b")
+
+        self.acks.clear()
+        await asyncio.sleep(0.02)
+
+        self.send_frame.assert_not_called()
+        self.assertEqual(self.acks.pending_acks, 0)
+        self.assertEqual(self.acks._delivered, {})
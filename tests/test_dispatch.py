@@ -0,0 +1,220 @@
+import asyncio
+
+from asynctest import patch
+
+from aiostomp.test_utils import AsyncTestCase, unittest_run_loop
+from aiostomp.dispatch import SubscriptionDispatcher, BatchDispatcher
+from aiostomp.frame import Frame
+
+
+def message(n):
+    return Frame("MESSAGE", {"message-id": str(n)}, None)
+
+
+class TestSubscriptionDispatcher(AsyncTestCase):
+    async def setUpAsync(self):
+        self.handled = []
+        self.running = 0
+        self.max_running = 0
+
+    async def handle(self, frame):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+
+        # Later frames finish first if they are handled concurrently
+        await asyncio.sleep(0.001 * (5 - int(frame.headers["message-id"])))
+
+        self.handled.append(frame.headers["message-id"])
+        self.running -= 1
+
+    def test_concurrency_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            SubscriptionDispatcher(self.handle, self.loop, concurrency=0)
+
+    @unittest_run_loop
+    async def test_frames_are_handled_in_order(self):
+        dispatcher = SubscriptionDispatcher(self.handle, self.loop)
+
+        for n in range(5):
+            dispatcher.put(message(n))
+
+        self.assertEqual(len(dispatcher), 5)
+        self.assertEqual(len(dispatcher._workers), 1)
+
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.handled, ["0", "1", "2", "3", "4"])
+        self.assertEqual(self.max_running, 1)
+
+    @unittest_run_loop
+    async def test_concurrency_is_bounded(self):
+        dispatcher = SubscriptionDispatcher(self.handle, self.loop, concurrency=3)
+
+        for n in range(5):
+            dispatcher.put(message(n))
+
+        self.assertEqual(len(dispatcher._workers), 3)
+
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(sorted(self.handled), ["0", "1", "2", "3", "4"])
+        self.assertEqual(self.max_running, 3)
+
+    @unittest_run_loop
+    async def test_idle_worker_is_reused(self):
+        dispatcher = SubscriptionDispatcher(self.handle, self.loop, concurrency=3)
+
+        dispatcher.put(message(4))
+        await asyncio.sleep(0.01)
+
+        dispatcher.put(message(4))
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(self.handled, ["4", "4"])
+        self.assertEqual(len(dispatcher._workers), 1)
+
+    @patch("aiostomp.dispatch.logger")
+    @unittest_run_loop
+    async def test_worker_survives_handler_errors(self, logger_mock):
+        async def handle(frame):
+            if frame.headers["message-id"] == "0":
+                raise ValueError()
+            self.handled.append(frame.headers["message-id"])
+
+        dispatcher = SubscriptionDispatcher(handle, self.loop)
+        dispatcher.put(message(0))
+        dispatcher.put(message(1))
+
+        await asyncio.sleep(0.001)
+
+        self.assertEqual(self.handled, ["1"])
+        logger_mock.exception.assert_called_once()
+
+    @unittest_run_loop
+    async def test_close_drains_queued_frames(self):
+        dispatcher = SubscriptionDispatcher(self.handle, self.loop)
+
+        for n in range(3):
+            dispatcher.put(message(n))
+        dispatcher.close()
+
+        with self.assertRaises(RuntimeError):
+            dispatcher.put(message(3))
+
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.handled, ["0", "1", "2"])
+        self.assertEqual(len(dispatcher._workers), 0)
+
+    @unittest_run_loop
+    async def test_close_stops_idle_workers(self):
+        dispatcher = SubscriptionDispatcher(self.handle, self.loop)
+
+        dispatcher.put(message(4))
+        await asyncio.sleep(0.01)
+        self.assertEqual(len(dispatcher._workers), 1)
+
+        dispatcher.close()
+        await asyncio.sleep(0.001)
+
+        self.assertEqual(len(dispatcher._workers), 0)
+
+
+class TestBatchDispatcher(AsyncTestCase):
+    async def setUpAsync(self):
+        self.batches = []
+
+    async def handle(self, frames):
+        self.batches.append([frame.headers["message-id"] for frame in frames])
+
+    def test_max_batch_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            BatchDispatcher(self.handle, self.loop, max_batch=0)
+
+    @unittest_run_loop
+    async def test_full_batches_are_handled_right_away(self):
+        dispatcher = BatchDispatcher(self.handle, self.loop, max_batch=3, max_wait=10)
+
+        for n in range(7):
+            dispatcher.put(message(n))
+
+        await asyncio.sleep(0.001)
+
+        self.assertEqual(self.batches, [["0", "1", "2"], ["3", "4", "5"]])
+        self.assertEqual(len(dispatcher), 1)
+
+    @unittest_run_loop
+    async def test_partial_batch_is_handled_after_max_wait(self):
+        dispatcher = BatchDispatcher(self.handle, self.loop, max_batch=3, max_wait=0.01)
+
+        dispatcher.put(message(0))
+        await asyncio.sleep(0.001)
+        dispatcher.put(message(1))
+        await asyncio.sleep(0.001)
+
+        self.assertEqual(self.batches, [])
+
+        await asyncio.sleep(0.02)
+
+        self.assertEqual(self.batches, [["0", "1"]])
+
+    @unittest_run_loop
+    async def test_batch_fills_while_waiting(self):
+        dispatcher = BatchDispatcher(self.handle, self.loop, max_batch=2, max_wait=10)
+
+        dispatcher.put(message(0))
+        await asyncio.sleep(0.001)
+        dispatcher.put(message(1))
+        await asyncio.sleep(0.001)
+
+        self.assertEqual(self.batches, [["0", "1"]])
+
+    @unittest_run_loop
+    async def test_concurrent_batches(self):
+        release = self.loop.create_future()
+
+        async def handle(frames):
+            self.batches.append(len(frames))
+            await release
+
+        dispatcher = BatchDispatcher(
+            handle, self.loop, concurrency=2, max_batch=2, max_wait=10
+        )
+
+        for n in range(6):
+            dispatcher.put(message(n))
+            await asyncio.sleep(0)
+
+        await asyncio.sleep(0.001)
+        self.assertEqual(self.batches, [2, 2])
+
+        release.set_result(None)
+        await asyncio.sleep(0.001)
+        self.assertEqual(self.batches, [2, 2, 2])
+
+    @unittest_run_loop
+    async def test_close_flushes_partial_batch(self):
+        dispatcher = BatchDispatcher(self.handle, self.loop, max_batch=3, max_wait=10)
+
+        dispatcher.put(message(0))
+        await asyncio.sleep(0.001)
+        dispatcher.close()
+        await asyncio.sleep(0.001)
+
+        self.assertEqual(self.batches, [["0"]])
+        self.assertEqual(len(dispatcher._workers), 0)
+
+    @patch("aiostomp.dispatch.logger")
+    @unittest_run_loop
+    async def test_worker_survives_batch_handler_errors(self, logger_mock):
+        async def handle(frames):
+            raise ValueError()
+
+        dispatcher = BatchDispatcher(handle, self.loop, max_batch=1)
+        dispatcher.put(message(0))
+        dispatcher.put(message(1))
+
+        await asyncio.sleep(0.001)
+
+        self.assertEqual(logger_mock.exception.call_count, 2)
+        self.assertEqual(len(dispatcher._workers), 1)
@@ -26,6 +26,13 @@ class TestStompStats(AsyncTestCase):
 
         self.assertEqual(stats.connection_stats[0]["something"], 1)
 
+    def test_can_increment_a_field_by_a_value(self):
+        stats = AioStompStats()
+        stats.increment("write_blocked_ms", 10)
+        stats.increment("write_blocked_ms", 5)
+
+        self.assertEqual(stats.connection_stats[0]["write_blocked_ms"], 15)
+
     @patch("aiostomp.aiostomp.logger")
     def test_can_print_stats(self, logger_mock):
         stats = AioStompStats()
@@ -135,11 +142,256 @@ class TestStompReader(AsyncTestCase):
         stomp._transport = Mock()
 
         stomp.send_frame("SUBSCRIBE", {"ack": "auto"}, "ç")
+        stomp._transport.write.assert_not_called()
+
+        await asyncio.sleep(0)
 
         stomp._transport.write.assert_called_with(
             b"SUBSCRIBE\n" b"ack:auto\n" b"\n" b"\xc3\xa7\x00"
         )
 
+    @unittest_run_loop
+    async def test_can_send_large_frame_without_copying_body(self):
+        stomp = StompReader(None, self.loop)
+        stomp._transport = Mock()
+
+        body = bytearray(StompReader.SCATTER_WRITE_SIZE)
+        stomp.send_frame("SEND", {"destination": "/queue/test"}, body)
+        stomp.flush()
+
+        stomp._transport.write.assert_not_called()
+
+        parts = stomp._transport.writelines.call_args[0][0]
+        self.assertEqual(parts[0], b"SEND\n" b"destination:/queue/test\n" b"\n")
+        self.assertIs(parts[1], body)
+        self.assertEqual(parts[2], b"\x00")
+
+    @unittest_run_loop
+    async def test_frames_are_coalesced_in_one_write_per_tick(self):
+        stomp = StompReader(None, self.loop)
+        stomp._transport = Mock()
+
+        stomp.send_frame("SEND", {"destination": "/queue/a"}, b"1")
+        stomp.ack(Frame("MESSAGE", {"subscription": "1", "message-id": "2"}, None))
+        stomp.write(b"\n")
+        stomp.send_frame("SEND", {"destination": "/queue/b"}, b"3")
+
+        stomp._transport.write.assert_not_called()
+
+        await asyncio.sleep(0)
+
+        stomp._transport.write.assert_called_once_with(
+            b"SEND\ndestination:/queue/a\n\n1\x00"
+            b"ACK\nmessage-id:2\nsubscription:1\n\n\x00"
+            b"\n"
+            b"SEND\ndestination:/queue/b\n\n3\x00"
+        )
+
+        await asyncio.sleep(0)
+        stomp._transport.write.assert_called_once()
+
+    @unittest_run_loop
+    async def test_write_buffer_is_flushed_early_when_full(self):
+        stomp = StompReader(None, self.loop)
+        stomp._transport = Mock()
+
+        body = b"x" * (StompReader.MAX_WRITE_BUFFER_SIZE // 2)
+        stomp.send_frame("SEND", {}, body)
+        stomp._transport.writelines.assert_not_called()
+
+        stomp.send_frame("SEND", {}, body)
+        stomp._transport.writelines.assert_called_once()
+
+        self.assertEqual(stomp._write_buffer, [])
+        self.assertIsNone(stomp._flush_handle)
+
+    @unittest_run_loop
+    async def test_write_buffer_is_flushed_on_close(self):
+        stomp = StompReader(None, self.loop)
+        transport = Mock()
+        stomp._transport = transport
+
+        stomp.send_frame("SEND", {}, b"1")
+        stomp.close()
+
+        transport.write.assert_called_once_with(b"SEND\n\n1\x00")
+        transport.close.assert_called_once()
+
+    @unittest_run_loop
+    async def test_write_buffer_is_dropped_on_connection_lost(self):
+        stomp = StompReader(Mock(), self.loop)
+        transport = Mock()
+        stomp._transport = transport
+
+        stomp.send_frame("SEND", {}, b"1")
+        stomp.connection_lost(None)
+
+        await asyncio.sleep(0)
+
+        transport.write.assert_not_called()
+        self.assertEqual(stomp._write_buffer, [])
+
+    @patch("aiostomp.aiostomp.StompReader.connect")
+    @unittest_run_loop
+    async def test_write_buffer_limits_are_set_on_connection(self, connect_mock):
+        stomp = StompReader(
+            None, self.loop, write_buffer_high=1024, write_buffer_low=256
+        )
+        transport = Mock()
+
+        stomp.connection_made(transport)
+
+        transport.set_write_buffer_limits.assert_called_once_with(high=1024, low=256)
+
+    @patch("aiostomp.aiostomp.StompReader.connect")
+    @unittest_run_loop
+    async def test_write_buffer_limits_are_not_set_by_default(self, connect_mock):
+        stomp = StompReader(None, self.loop)
+        transport = Mock()
+
+        stomp.connection_made(transport)
+
+        transport.set_write_buffer_limits.assert_not_called()
+
+    @unittest_run_loop
+    async def test_drain_returns_when_writing_is_not_paused(self):
+        stomp = StompReader(None, self.loop)
+        stomp._transport = Mock()
+
+        await stomp.drain()
+
+    @unittest_run_loop
+    async def test_drain_raises_when_disconnected(self):
+        stomp = StompReader(None, self.loop)
+
+        with self.assertRaises(StompDisconnectedError):
+            await stomp.drain()
+
+    @unittest_run_loop
+    async def test_drain_waits_for_resume_writing(self):
+        stats = AioStompStats()
+        stomp = StompReader(None, self.loop, stats=stats)
+        stomp._transport = Mock()
+
+        stomp.pause_writing()
+
+        first = self.loop.create_task(stomp.drain())
+        second = self.loop.create_task(stomp.drain())
+        await asyncio.sleep(0)
+
+        self.assertFalse(first.done())
+        self.assertFalse(second.done())
+
+        stomp.resume_writing()
+        await asyncio.gather(first, second)
+
+        self.assertEqual(stats.connection_stats[0]["write_blocked"], 2)
+        self.assertIn("write_blocked_ms", stats.connection_stats[0])
+
+    @unittest_run_loop
+    async def test_drain_fails_on_connection_lost(self):
+        stomp = StompReader(Mock(), self.loop)
+        stomp._transport = Mock()
+
+        stomp.pause_writing()
+        waiter = self.loop.create_task(stomp.drain())
+        await asyncio.sleep(0)
+
+        stomp.connection_lost(None)
+
+        with self.assertRaises(StompDisconnectedError):
+            await waiter
+
+        self.assertFalse(stomp._write_paused)
+
+    @unittest_run_loop
+    async def test_cancelled_drain_does_not_cancel_others(self):
+        stomp = StompReader(None, self.loop)
+        stomp._transport = Mock()
+
+        stomp.pause_writing()
+        first = self.loop.create_task(stomp.drain())
+        second = self.loop.create_task(stomp.drain())
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        self.assertFalse(second.done())
+
+        stomp.resume_writing()
+        await second
+
+    @unittest_run_loop
+    async def test_receipt_resolves_send_future(self):
+        stomp = StompReader(None, self.loop)
+        stomp._transport = Mock()
+
+        first = stomp.send_frame_with_receipt("SEND", {"destination": "/queue/a"}, b"1")
+        second = stomp.send_frame_with_receipt("SEND", {"destination": "/queue/a"}, b"2")
+
+        await asyncio.sleep(0)
+        stomp._transport.write.assert_called_once_with(
+            b"SEND\ndestination:/queue/a\nreceipt:1\n\n1\x00"
+            b"SEND\ndestination:/queue/a\nreceipt:2\n\n2\x00"
+        )
+        self.assertEqual(stomp.pending_receipts, 2)
+
+        stomp.data_received(b"RECEIPT\nreceipt-id:2\n\n\x00")
+
+        self.assertFalse(first.done())
+        self.assertTrue(second.done())
+        self.assertEqual(stomp.pending_receipts, 1)
+
+        stomp.data_received(b"RECEIPT\nreceipt-id:1\n\n\x00")
+        await first
+
+    @patch("aiostomp.aiostomp.logger")
+    @unittest_run_loop
+    async def test_unexpected_receipt_is_logged(self, logger_mock):
+        stomp = StompReader(None, self.loop)
+
+        stomp.data_received(b"RECEIPT\nreceipt-id:12\n\n\x00")
+
+        logger_mock.warning.assert_called_once_with("Unexpected receipt: %s", "12")
+
+    @unittest_run_loop
+    async def test_error_with_receipt_id_fails_send_future(self):
+        frame_handler = Mock()
+        frame_handler._on_error = None
+
+        stomp = StompReader(frame_handler, self.loop)
+        stomp._transport = Mock()
+
+        future = stomp.send_frame_with_receipt("SEND", {"destination": "/queue/a"}, b"1")
+
+        stomp.data_received(b"ERROR\nreceipt-id:1\nmessage:denied\n\n\x00")
+        await asyncio.sleep(0.001)
+
+        with self.assertRaises(StompError):
+            await future
+        self.assertEqual(stomp.pending_receipts, 0)
+
+    @unittest_run_loop
+    async def test_pending_receipts_fail_on_connection_lost(self):
+        stomp = StompReader(Mock(), self.loop)
+        stomp._transport = Mock()
+
+        future = stomp.send_frame_with_receipt("SEND", {}, b"1")
+        stomp.connection_lost(None)
+
+        with self.assertRaises(StompDisconnectedError):
+            await future
+        self.assertEqual(stomp.pending_receipts, 0)
+
+    @unittest_run_loop
+    async def test_send_with_receipt_can_raise_error(self):
+        stomp = StompReader(None, self.loop)
+
+        with self.assertRaises(StompDisconnectedError):
+            stomp.send_frame_with_receipt("SEND", {}, b"1")
+
+        self.assertEqual(stomp.pending_receipts, 0)
+
     @unittest_run_loop
     async def test_can_connect(self):
         stomp = StompReader(
@@ -237,7 +489,7 @@ class TestStompReader(AsyncTestCase):
         await stomp._handle_connect(frame)
 
         heartbeater_klass_mock.assert_called_with(
-            stomp._transport, interval=1000, logger=aiostomp.aiostomp.logger
+            stomp, interval=1000, logger=aiostomp.aiostomp.logger
         )
         heartbeater_mock.start.assert_called_once()
 
@@ -470,6 +722,424 @@ class TestStompReader(AsyncTestCase):
             "NACK", {"subscription": "123", "message-id": "321"}
         )
 
+    @patch("aiostomp.aiostomp.StompReader.send_frame")
+    @unittest_run_loop
+    async def test_lazy_headers_only_decodes_ack_headers(self, send_frame_mock):
+        handler = CoroutineMock()
+        handler.return_value = True
+        subscription = Subscription("/queue/test", 1, "client", {}, handler)
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stomp = StompReader(frame_handler, self.loop, lazy_headers=True)
+        stomp.data_received(
+            b"MESSAGE\n"
+            b"subscription:1\n"
+            b"message-id:007\n"
+            b"destination:/queue/test\n"
+            b"x-custom:something\n"
+            b"\n"
+            b"data\x00"
+        )
+
+        await asyncio.sleep(0.001)
+
+        frame = handler.call_args[0][0]
+        self.assertEqual(set(frame.headers._decoded), {"subscription", "message-id"})
+        send_frame_mock.assert_called_with(
+            "ACK", {"subscription": "1", "message-id": "007"}
+        )
+
+    @unittest_run_loop
+    async def test_messages_are_dispatched_in_order(self):
+        handled = []
+
+        async def handler(frame, body):
+            await asyncio.sleep(0.001 * (3 - int(body)))
+            handled.append(body)
+
+        subscription = Subscription("/queue/test", 1, "auto", {}, handler)
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stomp = StompReader(frame_handler, self.loop)
+        stomp.data_received(
+            b"MESSAGE\nsubscription:1\nmessage-id:1\n\n1\x00"
+            b"MESSAGE\nsubscription:1\nmessage-id:2\n\n2\x00"
+            b"MESSAGE\nsubscription:1\nmessage-id:3\n\n3\x00"
+        )
+
+        self.assertEqual(len(stomp._dispatchers[1]), 3)
+
+        await asyncio.sleep(0.02)
+
+        self.assertEqual(handled, [b"1", b"2", b"3"])
+
+    @unittest_run_loop
+    async def test_messages_are_dispatched_with_subscription_concurrency(self):
+        subscription = Subscription(
+            "/queue/test", 1, "auto", {}, CoroutineMock(), concurrency=4
+        )
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stomp = StompReader(frame_handler, self.loop)
+        stomp.data_received(b"MESSAGE\nsubscription:1\nmessage-id:1\n\n1\x00" * 10)
+
+        self.assertEqual(stomp._dispatchers[1].concurrency, 4)
+        self.assertEqual(len(stomp._dispatchers[1]._workers), 4)
+
+        await asyncio.sleep(0.001)
+
+        self.assertEqual(subscription.handler.call_count, 10)
+
+    @unittest_run_loop
+    async def test_dispatchers_are_closed_on_connection_lost(self):
+        subscription = Subscription("/queue/test", 1, "auto", {}, CoroutineMock())
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stomp = StompReader(frame_handler, self.loop)
+        stomp.data_received(b"MESSAGE\nsubscription:1\nmessage-id:1\n\n1\x00")
+        dispatcher = stomp._dispatchers[1]
+
+        stomp.connection_lost(None)
+        await asyncio.sleep(0.001)
+
+        self.assertEqual(stomp._dispatchers, {})
+        self.assertEqual(len(dispatcher._workers), 0)
+        subscription.handler.assert_called_once()
+
+    @patch("aiostomp.aiostomp.StompReader.send_frame")
+    @unittest_run_loop
+    async def test_batch_handler_acks_the_whole_batch(self, send_frame_mock):
+        batch_handler = CoroutineMock(return_value=True)
+        subscription = Subscription(
+            "/queue/test", 1, "client-individual", {}, None,
+            batch_handler=batch_handler, max_batch=2,
+        )
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stats = AioStompStats()
+        stomp = StompReader(frame_handler, self.loop, stats=stats)
+        stomp.data_received(
+            b"MESSAGE\nsubscription:1\nmessage-id:1\n\n1\x00"
+            b"MESSAGE\nsubscription:1\nmessage-id:2\n\n2\x00"
+        )
+
+        await asyncio.sleep(0.001)
+
+        frames = batch_handler.call_args[0][0]
+        self.assertEqual([frame.body for frame in frames], [b"1", b"2"])
+        self.assertEqual(
+            send_frame_mock.call_args_list,
+            [
+                (("ACK", {"subscription": "1", "message-id": "1"}),),
+                (("ACK", {"subscription": "1", "message-id": "2"}),),
+            ],
+        )
+        self.assertEqual(stats.connection_stats[0]["rec_msg"], 2)
+        self.assertEqual(stomp.inflight_messages, 0)
+
+    @patch("aiostomp.aiostomp.StompReader.send_frame")
+    @unittest_run_loop
+    async def test_batch_handler_nacks_the_whole_batch(self, send_frame_mock):
+        batch_handler = CoroutineMock(return_value=False)
+        subscription = Subscription(
+            "/queue/test", 1, "client", {}, None,
+            batch_handler=batch_handler, max_batch=10, max_wait_ms=1,
+        )
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stomp = StompReader(frame_handler, self.loop)
+        stomp.data_received(
+            b"MESSAGE\nsubscription:1\nmessage-id:1\n\n1\x00"
+            b"MESSAGE\nsubscription:1\nmessage-id:2\n\n2\x00"
+        )
+
+        await asyncio.sleep(0.01)
+
+        batch_handler.assert_called_once()
+        self.assertEqual(
+            send_frame_mock.call_args_list,
+            [
+                (("NACK", {"subscription": "1", "message-id": "1"}),),
+                (("NACK", {"subscription": "1", "message-id": "2"}),),
+            ],
+        )
+
+    @unittest_run_loop
+    async def test_client_acks_are_coalesced(self):
+        subscription = Subscription(
+            "/queue/test", 1, "client", {}, CoroutineMock(return_value=True),
+            concurrency=3,
+        )
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stomp = StompReader(frame_handler, self.loop, ack_flush_interval_ms=5)
+        stomp._transport = Mock()
+
+        stomp.data_received(
+            b"MESSAGE\nsubscription:1\nmessage-id:1\n\n1\x00"
+            b"MESSAGE\nsubscription:1\nmessage-id:2\n\n2\x00"
+            b"MESSAGE\nsubscription:1\nmessage-id:3\n\n3\x00"
+        )
+
+        await asyncio.sleep(0.001)
+        self.assertEqual(stomp.pending_acks, 3)
+        stomp._transport.write.assert_not_called()
+
+        await asyncio.sleep(0.01)
+
+        stomp._transport.write.assert_called_once_with(
+            b"ACK\nmessage-id:3\nsubscription:1\n\n\x00"
+        )
+        self.assertEqual(stomp.pending_acks, 0)
+        self.assertGreater(stomp.ack_flush_latency, 0)
+
+    @unittest_run_loop
+    async def test_client_individual_acks_are_written_together(self):
+        subscription = Subscription(
+            "/queue/test", 1, "client-individual", {}, CoroutineMock(return_value=True)
+        )
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stomp = StompReader(frame_handler, self.loop, ack_flush_interval_ms=5)
+        stomp._transport = Mock()
+
+        stomp.data_received(
+            b"MESSAGE\nsubscription:1\nmessage-id:1\n\n1\x00"
+            b"MESSAGE\nsubscription:1\nmessage-id:2\n\n2\x00"
+        )
+
+        await asyncio.sleep(0.01)
+
+        stomp._transport.write.assert_called_once_with(
+            b"ACK\nmessage-id:1\nsubscription:1\n\n\x00"
+            b"ACK\nmessage-id:2\nsubscription:1\n\n\x00"
+        )
+
+    @unittest_run_loop
+    async def test_coalesced_nack_is_sent_right_away(self):
+        stomp = StompReader(None, self.loop, ack_flush_interval_ms=1000)
+        stomp._transport = Mock()
+
+        stomp.ack(Frame("MESSAGE", {"subscription": "1", "message-id": "1"}, None))
+        stomp.nack(Frame("MESSAGE", {"subscription": "1", "message-id": "2"}, None))
+
+        await asyncio.sleep(0)
+
+        stomp._transport.write.assert_called_once_with(
+            b"ACK\nmessage-id:1\nsubscription:1\n\n\x00"
+            b"NACK\nmessage-id:2\nsubscription:1\n\n\x00"
+        )
+
+    @unittest_run_loop
+    async def test_transactional_acks_bypass_coalescing(self):
+        stomp = StompReader(None, self.loop, ack_flush_interval_ms=1000)
+        stomp._transport = Mock()
+        stomp._acks.delivered("1", "1")
+        stomp._acks.delivered("1", "2")
+
+        stomp.ack(Frame("MESSAGE", {"subscription": "1", "message-id": "1"}, None), transaction="tx-1")
+        stomp.nack(Frame("MESSAGE", {"subscription": "1", "message-id": "3"}, None), transaction="tx-1")
+
+        await asyncio.sleep(0)
+
+        stomp._transport.write.assert_called_once_with(
+            b"ACK\nmessage-id:1\nsubscription:1\ntransaction:tx-1\n\n\x00"
+            b"NACK\nmessage-id:3\nsubscription:1\ntransaction:tx-1\n\n\x00"
+        )
+        self.assertEqual(stomp.pending_acks, 0)
+        self.assertEqual(list(stomp._acks._delivered["1"]), ["2"])
+
+    @unittest_run_loop
+    async def test_pending_acks_are_flushed_on_close(self):
+        stomp = StompReader(None, self.loop, ack_flush_interval_ms=1000)
+        transport = Mock()
+        stomp._transport = transport
+
+        stomp.ack(Frame("MESSAGE", {"subscription": "1", "message-id": "1"}, None))
+        self.assertEqual(stomp.pending_acks, 1)
+
+        stomp.close()
+
+        transport.write.assert_called_once_with(
+            b"ACK\nmessage-id:1\nsubscription:1\n\n\x00"
+        )
+        self.assertEqual(stomp.pending_acks, 0)
+
+    @unittest_run_loop
+    async def test_pending_acks_are_dropped_on_connection_lost(self):
+        stomp = StompReader(Mock(), self.loop, ack_flush_interval_ms=1)
+        transport = Mock()
+        stomp._transport = transport
+
+        stomp.ack(Frame("MESSAGE", {"subscription": "1", "message-id": "1"}, None))
+        stomp.connection_lost(None)
+
+        await asyncio.sleep(0.01)
+
+        transport.write.assert_not_called()
+        self.assertEqual(stomp.pending_acks, 0)
+
+    @unittest_run_loop
+    async def test_reading_is_paused_over_inflight_messages(self):
+        release = self.loop.create_future()
+
+        async def handler(frame, body):
+            await release
+
+        subscription = Subscription(
+            "/queue/test", 1, "auto", {}, handler, concurrency=10
+        )
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stats = AioStompStats()
+        stomp = StompReader(
+            frame_handler, self.loop, stats=stats, max_inflight_messages=2
+        )
+        stomp._transport = Mock()
+
+        stomp.data_received(b"MESSAGE\nsubscription:1\nmessage-id:1\n\n1\x00")
+        self.assertEqual(stomp.inflight_messages, 1)
+        stomp._transport.pause_reading.assert_not_called()
+
+        stomp.data_received(b"MESSAGE\nsubscription:1\nmessage-id:2\n\n2\x00")
+        self.assertEqual(stomp.inflight_messages, 2)
+        self.assertEqual(stomp.inflight_bytes, 2)
+        self.assertTrue(stomp.reading_paused)
+        stomp._transport.pause_reading.assert_called_once()
+
+        await asyncio.sleep(0.01)
+        release.set_result(None)
+        await asyncio.sleep(0.001)
+
+        self.assertEqual(stomp.inflight_messages, 0)
+        self.assertEqual(stomp.inflight_bytes, 0)
+        self.assertFalse(stomp.reading_paused)
+        stomp._transport.resume_reading.assert_called_once()
+
+        self.assertGreater(stomp.read_paused_time, 0)
+        self.assertEqual(stats.connection_stats[0]["read_paused"], 1)
+        self.assertIn("read_paused_ms", stats.connection_stats[0])
+
+    @unittest_run_loop
+    async def test_reading_is_paused_over_inflight_bytes(self):
+        subscription = Subscription("/queue/test", 1, "auto", {}, CoroutineMock())
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stomp = StompReader(frame_handler, self.loop, max_inflight_bytes=8)
+        stomp._transport = Mock()
+
+        stomp.data_received(b"MESSAGE\nsubscription:1\nmessage-id:1\n\n1234\x00")
+        stomp._transport.pause_reading.assert_not_called()
+
+        stomp.data_received(b"MESSAGE\nsubscription:1\nmessage-id:2\n\n5678\x00")
+        stomp._transport.pause_reading.assert_called_once()
+
+        await asyncio.sleep(0.001)
+
+        self.assertEqual(stomp.inflight_bytes, 0)
+        stomp._transport.resume_reading.assert_called_once()
+
+    @unittest_run_loop
+    async def test_reading_is_not_paused_without_budget(self):
+        subscription = Subscription("/queue/test", 1, "auto", {}, CoroutineMock())
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stomp = StompReader(frame_handler, self.loop)
+        stomp._transport = Mock()
+
+        stomp.data_received(b"MESSAGE\nsubscription:1\nmessage-id:1\n\n1\x00" * 100)
+
+        self.assertEqual(stomp.inflight_messages, 100)
+        stomp._transport.pause_reading.assert_not_called()
+
+        await asyncio.sleep(0.001)
+        self.assertEqual(stomp.inflight_messages, 0)
+
+    @unittest_run_loop
+    async def test_read_pause_ends_on_connection_lost(self):
+        release = self.loop.create_future()
+
+        async def handler(frame, body):
+            await release
+
+        subscription = Subscription("/queue/test", 1, "auto", {}, handler)
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stomp = StompReader(frame_handler, self.loop, max_inflight_messages=1)
+        transport = Mock()
+        stomp._transport = transport
+
+        stomp.data_received(b"MESSAGE\nsubscription:1\nmessage-id:1\n\n1\x00")
+        self.assertTrue(stomp.reading_paused)
+
+        stomp.connection_lost(None)
+        self.assertFalse(stomp.reading_paused)
+
+        release.set_result(None)
+        await asyncio.sleep(0.001)
+
+        self.assertEqual(stomp.inflight_messages, 0)
+        transport.resume_reading.assert_not_called()
+
+    @unittest_run_loop
+    async def test_can_remove_dispatcher(self):
+        subscription = Subscription("/queue/test", 1, "auto", {}, CoroutineMock())
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stomp = StompReader(frame_handler, self.loop)
+        stomp.data_received(b"MESSAGE\nsubscription:1\nmessage-id:1\n\n1\x00")
+
+        stomp.remove_dispatcher(subscription)
+        stomp.remove_dispatcher(subscription)
+
+        self.assertEqual(stomp._dispatchers, {})
+
+    @unittest_run_loop
+    async def test_can_handle_message_with_body_view(self):
+        handler = CoroutineMock()
+        subscription = Subscription("/queue/test", 1, "auto", {}, handler, body_view=True)
+
+        frame_handler = Mock()
+        frame_handler.get.return_value = subscription
+
+        stomp = StompReader(frame_handler, self.loop)
+        stomp.data_received(
+            b"MESSAGE\n" b"subscription:1\n" b"message-id:007\n" b"content-length:4\n\n"
+        )
+        stomp.data_received(b"data\x00")
+
+        await asyncio.sleep(0.001)
+
+        frame, body = handler.call_args[0]
+        self.assertIsInstance(body, memoryview)
+        self.assertEqual(body.tobytes(), b"data")
+
     @patch("aiostomp.aiostomp.StompReader._handle_error")
     @unittest_run_loop
     async def test_can_process_error(self, error_handle_mock):
@@ -659,6 +1329,42 @@ class TestAioStomp(AsyncTestCase):
         self.assertEqual(len(self.stomp._subscriptions), 1)
         self.stomp._protocol.subscribe.assert_not_called()
 
+    def test_can_subscribe_with_body_view(self):
+        subscription = self.stomp.subscribe("/queue/test", body_view=True)
+
+        self.assertTrue(subscription.body_view)
+        self.assertFalse(self.stomp.subscribe("/queue/other").body_view)
+
+    def test_can_subscribe_with_concurrency(self):
+        subscription = self.stomp.subscribe("/queue/test", concurrency=8)
+
+        self.assertEqual(subscription.concurrency, 8)
+
+    def test_cannot_subscribe_without_concurrency(self):
+        with self.assertRaises(ValueError):
+            self.stomp.subscribe("/queue/test", concurrency=0)
+
+    def test_can_subscribe_with_batch_handler(self):
+        batch_handler = CoroutineMock()
+        subscription = self.stomp.subscribe(
+            "/queue/test", batch_handler=batch_handler, max_batch=500, max_wait_ms=20
+        )
+
+        self.assertIsNone(subscription.handler)
+        self.assertEqual(subscription.batch_handler, batch_handler)
+        self.assertEqual(subscription.max_batch, 500)
+        self.assertEqual(subscription.max_wait_ms, 20)
+
+    def test_cannot_subscribe_with_handler_and_batch_handler(self):
+        with self.assertRaises(ValueError):
+            self.stomp.subscribe(
+                "/queue/test", handler=CoroutineMock(), batch_handler=CoroutineMock()
+            )
+
+    def test_cannot_subscribe_with_empty_batches(self):
+        with self.assertRaises(ValueError):
+            self.stomp.subscribe("/queue/test", batch_handler=CoroutineMock(), max_batch=0)
+
     def test_can_get_subscription(self):
         self.stomp._protocol.subscribe = Mock()
 
@@ -773,6 +1479,17 @@ class TestAioStomp(AsyncTestCase):
             b"my body utf-8 \xc3\xa7",
         )
 
+    def test_can_send_message_with_body_memoryview(self):
+        send_mock = Mock()
+        self.stomp._protocol.send = send_mock
+
+        body = memoryview(bytearray(b"\x00\x01\x02\x03")).cast("H")
+        self.stomp.send("/topic/test", body=body)
+
+        send_mock.assert_called_with(
+            {"destination": "/topic/test", "content-length": 4}, body
+        )
+
     def test_can_send_message_without_body(self):
         send_mock = Mock()
         self.stomp._protocol.send = send_mock
@@ -788,6 +1505,138 @@ class TestAioStomp(AsyncTestCase):
             b"",
         )
 
+    @unittest_run_loop
+    async def test_can_send_message_async(self):
+        self.stomp._protocol.send = Mock()
+        self.stomp._protocol.drain = CoroutineMock()
+
+        await self.stomp.send_async("/topic/test", body=b"1")
+
+        self.stomp._protocol.send.assert_called_with(
+            {"destination": "/topic/test", "content-length": 1}, b"1"
+        )
+        self.stomp._protocol.drain.assert_called_once()
+
+    @unittest_run_loop
+    async def test_can_send_many_messages_async(self):
+        self.stomp._protocol.send = Mock()
+        self.stomp._protocol.drain = CoroutineMock()
+        headers = {"my-header": "my-value"}
+
+        await self.stomp.send_many_async("/topic/test", [b"1", "22"], headers=headers)
+
+        self.assertEqual(
+            self.stomp._protocol.send.call_args_list,
+            [
+                (
+                    (
+                        {"my-header": "my-value", "destination": "/topic/test", "content-length": 1},
+                        b"1",
+                    ),
+                ),
+                (
+                    (
+                        {"my-header": "my-value", "destination": "/topic/test", "content-length": 2},
+                        b"22",
+                    ),
+                ),
+            ],
+        )
+        self.assertEqual(self.stomp._protocol.drain.call_count, 2)
+        self.assertEqual(headers, {"my-header": "my-value"})
+
+    def test_inflight_counters_without_connection(self):
+        self.assertEqual(self.stomp.inflight_messages, 0)
+        self.assertEqual(self.stomp.inflight_bytes, 0)
+        self.assertFalse(self.stomp.reading_paused)
+        self.assertEqual(self.stomp.read_paused_time, 0.0)
+
+    def test_inflight_counters_of_the_connection(self):
+        self.stomp._protocol._protocol = Mock(
+            inflight_messages=3,
+            inflight_bytes=300,
+            reading_paused=True,
+            read_paused_time=1.5,
+        )
+
+        self.assertEqual(self.stomp.inflight_messages, 3)
+        self.assertEqual(self.stomp.inflight_bytes, 300)
+        self.assertTrue(self.stomp.reading_paused)
+        self.assertEqual(self.stomp.read_paused_time, 1.5)
+
+    def test_ack_counters_without_connection(self):
+        self.assertEqual(self.stomp.pending_acks, 0)
+        self.assertEqual(self.stomp.ack_flush_latency, 0.0)
+
+    def test_ack_counters_of_the_connection(self):
+        self.stomp._protocol._protocol = Mock(pending_acks=7, ack_flush_latency=0.05)
+
+        self.assertEqual(self.stomp.pending_acks, 7)
+        self.assertEqual(self.stomp.ack_flush_latency, 0.05)
+
+    def test_can_send_message_with_receipt(self):
+        future = Mock()
+        self.stomp._protocol.send = Mock(return_value=future)
+
+        result = self.stomp.send("/topic/test", body=b"1", receipt=True)
+
+        self.assertIs(result, future)
+        self.stomp._protocol.send.assert_called_with(
+            {"destination": "/topic/test", "content-length": 1}, b"1", receipt=True
+        )
+
+    @unittest_run_loop
+    async def test_can_send_message_async_with_receipt(self):
+        future = Mock()
+        self.stomp._protocol.send = Mock(return_value=future)
+        self.stomp._protocol.drain = CoroutineMock()
+
+        result = await self.stomp.send_async("/topic/test", body=b"1", receipt=True)
+
+        self.assertIs(result, future)
+
+    def test_pending_receipts_without_connection(self):
+        self.assertEqual(self.stomp.pending_receipts, 0)
+
+    def test_can_create_windowed_publisher(self):
+        publisher = self.stomp.windowed_publisher(window=10)
+
+        self.assertEqual(publisher.window, 10)
+
+    def test_can_create_transactions(self):
+        first = self.stomp.transaction()
+        second = self.stomp.transaction(receipt=False)
+
+        self.assertEqual(first.id, "tx-1")
+        self.assertTrue(first.receipt)
+        self.assertEqual(second.id, "tx-2")
+        self.assertFalse(second.receipt)
+
+    def test_can_create_batching_publisher(self):
+        publisher = self.stomp.batching_publisher(max_messages=10, max_wait_ms=5)
+
+        self.assertEqual(publisher.max_messages, 10)
+        self.assertEqual(publisher.max_wait_ms, 5)
+
+    def test_can_begin_commit_and_abort(self):
+        self.stomp._protocol = Mock()
+
+        self.stomp.begin("tx-1")
+        self.stomp.commit("tx-1", receipt=True)
+        self.stomp.abort("tx-2")
+
+        self.stomp._protocol.begin.assert_called_once_with("tx-1")
+        self.stomp._protocol.commit.assert_called_once_with("tx-1", receipt=True)
+        self.stomp._protocol.abort.assert_called_once_with("tx-2")
+
+    @unittest_run_loop
+    async def test_can_drain(self):
+        self.stomp._protocol.drain = CoroutineMock()
+
+        await self.stomp.drain()
+
+        self.stomp._protocol.drain.assert_called_once()
+
     def test_can_ack_a_frame(self):
         self.stomp._protocol.subscribe = Mock()
         self.stomp._protocol.ack = Mock()
@@ -799,7 +1648,33 @@ class TestAioStomp(AsyncTestCase):
 
         self.stomp.ack(frame)
 
-        self.stomp._protocol.ack.assert_called_with(frame)
+        self.stomp._protocol.ack.assert_called_with(frame, transaction=None)
+
+    def test_can_ack_a_frame_in_a_transaction(self):
+        self.stomp._protocol.subscribe = Mock()
+        self.stomp._protocol.ack = Mock()
+        self.stomp._protocol.nack = Mock()
+
+        self.stomp.subscribe("/queue/test", auto_ack=False)
+
+        frame = Frame("MESSAGE", {"subscription": "1"}, "data")
+
+        self.stomp.ack(frame, transaction="tx-1")
+        self.stomp.nack(frame, transaction="tx-1")
+
+        self.stomp._protocol.ack.assert_called_with(frame, transaction="tx-1")
+        self.stomp._protocol.nack.assert_called_with(frame, transaction="tx-1")
+
+    def test_can_create_pipeline(self):
+        async def transform(frame, body):
+            return body
+
+        pipeline = self.stomp.pipeline("/queue/in", "/queue/out", transform, max_batch=10)
+
+        self.assertEqual(pipeline.source, "/queue/in")
+        self.assertEqual(pipeline.destination, "/queue/out")
+        self.assertEqual(pipeline.max_batch, 10)
+        self.assertEqual(pipeline.ack, "client-individual")
 
     def test_can_nack_a_frame(self):
         self.stomp._protocol.subscribe = Mock()
@@ -812,7 +1687,7 @@ class TestAioStomp(AsyncTestCase):
 
         self.stomp.nack(frame)
 
-        self.stomp._protocol.nack.assert_called_with(frame)
+        self.stomp._protocol.nack.assert_called_with(frame, transaction=None)
 
     def test_cannot_ack_an_unsubscribed_frame(self):
         self.stomp._protocol.ack = Mock()
@@ -928,6 +1803,64 @@ class TestStompProtocol(AsyncTestCase):
         self._protocol.send_frame.assert_called_with(
             "UNSUBSCRIBE", {"id": 1, "destination": "/queue/123"}
         )
+        self._protocol.remove_dispatcher.assert_called_with(subscription)
+
+    @unittest_run_loop
+    async def test_can_send_with_receipt(self):
+        await self.protocol.connect()
+        self.protocol.send({"content-length": 2}, "{}", receipt=True)
+
+        self._protocol.send_frame_with_receipt.assert_called_with(
+            "SEND", {"content-length": 2}, "{}"
+        )
+
+    @unittest_run_loop
+    async def test_can_begin_commit_and_abort(self):
+        await self.protocol.connect()
+
+        self.protocol.begin("tx-1")
+        self._protocol.send_frame.assert_called_with("BEGIN", {"transaction": "tx-1"})
+
+        self.assertIsNone(self.protocol.commit("tx-1"))
+        self._protocol.send_frame.assert_called_with("COMMIT", {"transaction": "tx-1"})
+
+        self.protocol.abort("tx-1")
+        self._protocol.send_frame.assert_called_with("ABORT", {"transaction": "tx-1"})
+
+    @unittest_run_loop
+    async def test_can_commit_with_receipt(self):
+        await self.protocol.connect()
+
+        future = self.protocol.commit("tx-1", receipt=True)
+
+        self.assertIs(future, self._protocol.send_frame_with_receipt.return_value)
+        self._protocol.send_frame_with_receipt.assert_called_with(
+            "COMMIT", {"transaction": "tx-1"}
+        )
+
+    def test_cannot_use_transactions_when_not_connected(self):
+        with self.assertRaises(RuntimeError):
+            self.protocol.begin("tx-1")
+
+        with self.assertRaises(RuntimeError):
+            self.protocol.commit("tx-1")
+
+        with self.assertRaises(RuntimeError):
+            self.protocol.abort("tx-1")
+
+    @unittest_run_loop
+    async def test_can_drain(self):
+        self._protocol.drain = CoroutineMock()
+
+        await self.protocol.connect()
+        await self.protocol.drain()
+
+        self._protocol.drain.assert_called_once()
+
+    @unittest_run_loop
+    async def test_cannot_drain_when_not_connected(self):
+        with self.assertRaises(RuntimeError):
+            await self.protocol.drain()
 
     @unittest_run_loop
     async def test_can_send(self):
@@ -0,0 +1,155 @@
+import asyncio
+
+from asynctest import CoroutineMock, Mock
+
+from aiostomp.test_utils import AsyncTestCase, unittest_run_loop
+from aiostomp.errors import StompError, StompDisconnectedError
+from aiostomp.frame import Frame
+from aiostomp.pipeline import Pipeline
+from aiostomp.transaction import Transaction
+
+
+def message(message_id, body="data"):
+    return Frame("MESSAGE", {"subscription": "1", "message-id": message_id}, body)
+
+
+class TestPipeline(AsyncTestCase):
+    async def setUpAsync(self):
+        self.client = Mock()
+        self.client.drain = CoroutineMock()
+
+        self.commit_future = self.loop.create_future()
+        self.commit_future.set_result(None)
+        self.client.commit.return_value = self.commit_future
+
+        self.client.transaction.side_effect = lambda receipt: Transaction(
+            self.client, "tx-1", receipt=receipt
+        )
+
+    async def upper(self, frame, body):
+        return body.upper()
+
+    def test_ack_mode_must_be_client(self):
+        with self.assertRaises(ValueError):
+            Pipeline(self.client, "/queue/in", "/queue/out", self.upper, ack="auto")
+
+    def test_start_subscribes_with_batch_handler(self):
+        pipeline = Pipeline(
+            self.client, "/queue/in", "/queue/out", self.upper, max_batch=10, max_wait_ms=5
+        )
+
+        subscription = pipeline.start()
+
+        self.assertIs(subscription, self.client.subscribe.return_value)
+        self.client.subscribe.assert_called_once_with(
+            "/queue/in",
+            ack="client-individual",
+            auto_ack=False,
+            batch_handler=pipeline._handle_batch,
+            max_batch=10,
+            max_wait_ms=5,
+            concurrency=1,
+        )
+
+        with self.assertRaises(RuntimeError):
+            pipeline.start()
+
+        pipeline.stop()
+        self.client.unsubscribe.assert_called_once_with(subscription)
+
+        # Already stopped
+        pipeline.stop()
+        self.client.unsubscribe.assert_called_once_with(subscription)
+
+    @unittest_run_loop
+    async def test_batch_is_sent_and_acked_in_one_transaction(self):
+        pipeline = Pipeline(self.client, "/queue/in", "/queue/out", self.upper)
+        frames = [message("1", "a"), message("2", "b")]
+
+        await pipeline._handle_batch(frames)
+
+        self.client.begin.assert_called_once_with("tx-1")
+        self.assertEqual(
+            self.client.send.call_args_list,
+            [
+                (("/queue/out", "A", {"transaction": "tx-1"}, True),),
+                (("/queue/out", "B", {"transaction": "tx-1"}, True),),
+            ],
+        )
+        self.assertEqual(
+            self.client.ack.call_args_list,
+            [((frames[0],), {"transaction": "tx-1"}), ((frames[1],), {"transaction": "tx-1"})],
+        )
+        self.client.drain.assert_called_once()
+        self.client.commit.assert_called_once_with("tx-1", receipt=True)
+        self.client.nack.assert_not_called()
+
+        self.assertEqual(pipeline.batches, 1)
+        self.assertEqual(pipeline.messages, 2)
+        self.assertEqual(pipeline.failed_batches, 0)
+        self.assertGreaterEqual(pipeline.max_batch_latency, pipeline.last_batch_latency)
+        self.assertEqual(pipeline.mean_batch_latency, pipeline.last_batch_latency)
+
+    @unittest_run_loop
+    async def test_messages_can_be_dropped(self):
+        async def drop(frame, body):
+            return None
+
+        pipeline = Pipeline(self.client, "/queue/in", "/queue/out", drop)
+
+        await pipeline._handle_batch([message("1")])
+
+        self.client.send.assert_not_called()
+        self.client.ack.assert_called_once()
+        self.client.commit.assert_called_once()
+
+    @unittest_run_loop
+    async def test_failed_transform_aborts_and_nacks(self):
+        async def fail(frame, body):
+            if frame.headers["message-id"] == "2":
+                raise ValueError()
+            return body
+
+        pipeline = Pipeline(self.client, "/queue/in", "/queue/out", fail)
+        frames = [message("1"), message("2")]
+
+        with self.assertLogs("aiostomp", level="ERROR"):
+            await pipeline._handle_batch(frames)
+
+        self.client.abort.assert_called_once_with("tx-1")
+        self.client.commit.assert_not_called()
+        self.assertEqual(
+            self.client.nack.call_args_list, [((frames[0],),), ((frames[1],),)]
+        )
+        self.assertEqual(pipeline.batches, 0)
+        self.assertEqual(pipeline.failed_batches, 1)
+
+    @unittest_run_loop
+    async def test_failed_commit_nacks(self):
+        self.client.commit.return_value = self.loop.create_future()
+        self.client.commit.return_value.set_exception(StompError("denied", None))
+
+        pipeline = Pipeline(self.client, "/queue/in", "/queue/out", self.upper)
+        frames = [message("1")]
+
+        with self.assertLogs("aiostomp", level="ERROR"):
+            await pipeline._handle_batch(frames)
+
+        self.client.abort.assert_not_called()
+        self.client.nack.assert_called_once_with(frames[0])
+        self.assertEqual(pipeline.failed_batches, 1)
+
+    @unittest_run_loop
+    async def test_disconnect_leaves_redelivery_to_broker(self):
+        self.client.drain.side_effect = StompDisconnectedError()
+        self.client.abort.side_effect = StompDisconnectedError()
+
+        pipeline = Pipeline(self.client, "/queue/in", "/queue/out", self.upper)
+
+        with self.assertLogs("aiostomp", level="ERROR"):
+            await pipeline._handle_batch([message("1")])
+
+        self.client.nack.assert_not_called()
+        self.assertEqual(pipeline.failed_batches, 1)
+
+        await asyncio.sleep(0)
@@ -0,0 +1,121 @@
+import asyncio
+
+from asynctest import Mock
+
+from aiostomp.test_utils import AsyncTestCase, unittest_run_loop
+from aiostomp.errors import StompError
+from aiostomp.publisher import WindowedPublisher
+
+
+class TestWindowedPublisher(AsyncTestCase):
+    async def setUpAsync(self):
+        self.receipts = []
+        self.client = Mock()
+
+        async def send_async(destination, body, headers, send_content_length, receipt):
+            future = self.loop.create_future()
+            self.receipts.append(future)
+            return future
+
+        self.client.send_async = send_async
+
+    def test_window_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            WindowedPublisher(self.client, window=0)
+
+    @unittest_run_loop
+    async def test_sends_up_to_window_without_waiting(self):
+        publisher = WindowedPublisher(self.client, window=3)
+
+        for n in range(3):
+            await publisher.send("/queue/test", str(n))
+
+        self.assertEqual(publisher.in_flight, 3)
+
+    @unittest_run_loop
+    async def test_waits_for_a_receipt_when_window_is_full(self):
+        publisher = WindowedPublisher(self.client, window=2)
+
+        await publisher.send("/queue/test", "1")
+        await publisher.send("/queue/test", "2")
+
+        third = self.loop.create_task(publisher.send("/queue/test", "3"))
+        await asyncio.sleep(0)
+        self.assertFalse(third.done())
+        self.assertEqual(len(self.receipts), 2)
+
+        self.receipts[1].set_result(None)
+        await third
+
+        self.assertEqual(len(self.receipts), 3)
+        self.assertEqual(publisher.in_flight, 2)
+        self.assertEqual(publisher.confirmed, 1)
+
+    @unittest_run_loop
+    async def test_window_holds_with_concurrent_senders(self):
+        publisher = WindowedPublisher(self.client, window=2)
+
+        senders = [
+            self.loop.create_task(publisher.send("/queue/test", str(n)))
+            for n in range(5)
+        ]
+        await asyncio.sleep(0.001)
+        self.assertEqual(len(self.receipts), 2)
+
+        for n in range(5):
+            self.receipts[n].set_result(None)
+            await asyncio.sleep(0.001)
+            self.assertLessEqual(publisher.in_flight, 2)
+
+        await asyncio.gather(*senders)
+        self.assertEqual(len(self.receipts), 5)
+
+    @unittest_run_loop
+    async def test_flush_waits_for_all_receipts(self):
+        publisher = WindowedPublisher(self.client, window=10)
+
+        for n in range(3):
+            await publisher.send("/queue/test", str(n))
+
+        flush = self.loop.create_task(publisher.flush())
+        await asyncio.sleep(0)
+        self.assertFalse(flush.done())
+
+        for receipt in self.receipts:
+            receipt.set_result(None)
+
+        await flush
+        self.assertEqual(publisher.in_flight, 0)
+        self.assertEqual(publisher.confirmed, 3)
+
+    @unittest_run_loop
+    async def test_flush_raises_first_error(self):
+        publisher = WindowedPublisher(self.client, window=10)
+
+        await publisher.send("/queue/test", "1")
+        await publisher.send("/queue/test", "2")
+
+        self.receipts[0].set_exception(StompError("denied", None))
+        self.receipts[1].set_result(None)
+
+        with self.assertRaises(StompError):
+            await publisher.flush()
+
+        self.assertEqual(publisher.failed, 1)
+        self.assertEqual(publisher.confirmed, 1)
+
+        # The error is reported once
+        await publisher.flush()
+
+    @unittest_run_loop
+    async def test_failed_send_releases_its_slot(self):
+        async def send_async(*args, **kwargs):
+            raise ConnectionError()
+
+        self.client.send_async = send_async
+        publisher = WindowedPublisher(self.client, window=1)
+
+        with self.assertRaises(ConnectionError):
+            await publisher.send("/queue/test", "1")
+
+        self.assertEqual(publisher.in_flight, 0)
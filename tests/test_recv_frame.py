@@ -1,7 +1,7 @@
 # -*- coding:utf-8 -*-
 from unittest import TestCase
 
-from aiostomp.protocol import StompProtocol
+from aiostomp.protocol import StompProtocol, HEADER_NAMES, HEARTBEAT_FRAME
 
 from mock import MagicMock
 
@@ -341,6 +341,189 @@ class TestRecvFrame(TestCase):
 
         self.assertEqual(self.protocol._pending_parts, [])
 
+    def test_crlf_packet(self):
+        self.protocol.feed_data(
+            b"\r\nMESSAGE\r\n" b"subscription:1\r\n" b"message-id:007\r\n\r\n" b"hey\x00\r\n"
+        )
+
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual(len(frames), 3)
+
+        self.assertEqual(frames[0].command, u"HEARTBEAT")
+
+        self.assertEqual(frames[1].command, u"MESSAGE")
+        self.assertEqual(
+            frames[1].headers, {u"subscription": u"1", u"message-id": u"007"}
+        )
+        self.assertEqual(frames[1].body, b"hey")
+
+        self.assertEqual(frames[2].command, u"HEARTBEAT")
+
+    def test_content_length_body_with_frame_delimiters(self):
+        self.protocol.feed_data(
+            b"MESSAGE\n" b"content-length:8\n\n" b"a\n\nb\x00c\n\n\x00"
+        )
+
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(frames[0].body, b"a\n\nb\x00c\n\n")
+        self.assertEqual(len(self.protocol.current_command), 0)
+
+    def test_byte_at_a_time(self):
+        data = (
+            b"MESSAGE\n" b"content-length:3\n" b"subscription:1\n\n" b"abc\x00\n"
+            b"MESSAGE\n" b"subscription:2\n\n" b"def\x00\x00\n"
+        )
+
+        for i in range(len(data)):
+            self.protocol.feed_data(data[i:i + 1])
+
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual([f.command for f in frames], ["MESSAGE", "HEARTBEAT", "MESSAGE", "HEARTBEAT"])
+        self.assertEqual(frames[0].headers, {"content-length": "3", "subscription": "1"})
+        self.assertEqual(frames[0].body, b"abc")
+        self.assertEqual(frames[2].headers, {"subscription": "2"})
+        self.assertEqual(frames[2].body, b"def")
+        self.assertEqual(len(self.protocol.current_command), 0)
+
+    def test_terminators_across_chunk_boundaries(self):
+        stream_data = (
+            b"MESSAGE\r\nsubscription:1\r",
+            b"\n\r",
+            b"\nsome",
+            b"_data",
+            b"\x00MESSAGE\nsubscription:2\n",
+            b"\n\x00",
+        )
+
+        for data in stream_data:
+            self.protocol.feed_data(data)
+
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(frames[0].headers, {"subscription": "1"})
+        self.assertEqual(frames[0].body, b"some_data")
+        self.assertEqual(frames[1].headers, {"subscription": "2"})
+        self.assertEqual(frames[1].body, None)
+        self.assertEqual(self.protocol._scan_pos, 0)
+
+    def test_many_frames_in_one_chunk(self):
+        frame = self.protocol.build_frame(
+            "MESSAGE", {"subscription": "1", "content-length": 4}, b"ping"
+        )
+
+        self.protocol.feed_data(frame * 500)
+
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual(len(frames), 500)
+        self.assertTrue(all(f.body == b"ping" for f in frames))
+        self.assertEqual(len(self.protocol.current_command), 0)
+
+    def test_heartbeats_share_a_single_frame(self):
+        self.protocol.feed_data(b"\n\r\n\n")
+
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual(len(frames), 3)
+        self.assertTrue(all(frame is HEARTBEAT_FRAME for frame in frames))
+
+        with self.assertRaises(TypeError):
+            frames[0].headers["foo"] = "bar"
+
+    def test_well_known_header_names_are_shared(self):
+        self.protocol.feed_data(
+            b"MESSAGE\n" b"subscription:1\n" b"x-custom:1\n\n" b"data\x00"
+            b"MESSAGE\n" b"subscription:2\n" b"x-custom:2\n\n" b"data\x00"
+        )
+
+        first, second = self.protocol.pop_frames()
+
+        first_names = dict((name, name) for name in first.headers)
+        second_names = dict((name, name) for name in second.headers)
+
+        self.assertIs(first_names["subscription"], HEADER_NAMES[b"subscription"])
+        self.assertIs(second_names["subscription"], HEADER_NAMES[b"subscription"])
+        self.assertEqual(first_names["x-custom"], "x-custom")
+
+        with self.assertRaises(AttributeError):
+            first.extra = True
+
+    def test_invalid_headers_are_discarded(self):
+        with self.assertLogs("aiostomp.protocol", level="ERROR"):
+            self.protocol.feed_data(b"MESSAGE\n" b"invalid header\n\n" b"data\x00")
+
+        self.assertEqual(self.protocol.pop_frames(), [])
+        self.assertEqual(len(self.protocol.current_command), 0)
+
+        self.protocol.feed_data(b"CONNECTED\n" b"version:1.1\n\n\x00")
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(frames[0].headers, {"version": "1.1"})
+
+
+class TestBodyView(TestCase):
+    def setUp(self):
+        self.protocol = StompProtocol()
+        self.protocol.body_view_filter = lambda headers: headers.get("subscription") == "1"
+
+    def test_content_length_body_as_view(self):
+        stream_data = (
+            b"MESSAGE\n" b"subscription:1\n" b"content-length:10\n\n" b"0123",
+            b"456",
+            b"789",
+            b"\x00\nMESSAGE\n" b"subscription:2\n" b"content-length:3\n\n" b"abc\x00",
+        )
+
+        self.protocol.feed_data(stream_data[0])
+        self.assertEqual(len(self.protocol.current_command), 0)
+
+        self.protocol.feed_data(stream_data[1])
+        self.assertEqual(len(self.protocol.current_command), 0)
+
+        for data in stream_data[2:]:
+            self.protocol.feed_data(data)
+
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual([f.command for f in frames], ["MESSAGE", "HEARTBEAT", "MESSAGE"])
+
+        self.assertIsInstance(frames[0].body, memoryview)
+        self.assertTrue(frames[0].body.readonly)
+        self.assertEqual(frames[0].body.tobytes(), b"0123456789")
+
+        self.assertEqual(frames[2].body, b"abc")
+        self.assertIsInstance(frames[2].body, bytes)
+        self.assertEqual(len(self.protocol.current_command), 0)
+
+    def test_content_length_body_in_a_single_chunk(self):
+        self.protocol.feed_data(
+            b"MESSAGE\n" b"subscription:1\n" b"content-length:4\n\n" b"a\x00b\n\x00"
+            b"MESSAGE\n" b"subscription:1\n" b"content-length:0\n\n" b"\x00"
+        )
+
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(frames[0].body.tobytes(), b"a\x00b\n")
+        self.assertIsNone(frames[1].body)
+        self.assertEqual(len(self.protocol.current_command), 0)
+
+    def test_body_without_content_length_as_view(self):
+        self.protocol.feed_data(b"MESSAGE\n" b"subscription:1\n\n" b"data")
+        self.protocol.feed_data(b"\x00")
+
+        frames = self.protocol.pop_frames()
+
+        self.assertIsInstance(frames[0].body, memoryview)
+        self.assertTrue(frames[0].body.readonly)
+        self.assertEqual(frames[0].body.tobytes(), b"data")
+
 
 class TestBuildFrame(TestCase):
     def setUp(self):
@@ -355,6 +538,13 @@ class TestBuildFrame(TestCase):
             buf, b"HELLO\n" b"from:me\n" b"to:you\n\n" b"I Am The Walrus" b"\x00"
         )
 
+    def test_build_frame_parts(self):
+        body = memoryview(b"I Am The Walrus")
+        parts = self.protocol.build_frame_parts("HELLO", {"from": "me"}, body)
+
+        self.assertEqual(parts, [b"HELLO\n" b"from:me\n\n", body, b"\x00"])
+        self.assertIs(parts[1], body)
+
     def test_build_frame_without_body(self):
         buf = self.protocol.build_frame("HI", {"from": "1", "to": "2"})
 
@@ -386,6 +576,22 @@ class TestBuildFrame(TestCase):
             {"destination": "me:123", "extra": "you\nmore\rextra\\here"},
         )
 
+    def test_encode_header_without_special_chars(self):
+        self.assertEqual(self.protocol._encode_header("/queue/test"), "/queue/test")
+        self.assertEqual(self.protocol._encode_header(42), "42")
+
+    def test_encode_header_with_escaped_sequences(self):
+        self.assertEqual(self.protocol._encode_header("a\\nb"), "a\\\\nb")
+        self.assertEqual(self.protocol._encode_header("\\:\n\r"), "\\\\\\c\\n\\r")
+
+    def test_decode_header(self):
+        self.assertEqual(self.protocol._decode_header(b"/queue/test"), "/queue/test")
+        self.assertEqual(self.protocol._decode_header(b"a\\cb\\nc\\rd"), "a:b\nc\rd")
+        self.assertEqual(self.protocol._decode_header(b"a\\\\nb"), "a\\nb")
+        self.assertEqual(self.protocol._decode_header(b"a\\\\\\nb"), "a\\\nb")
+        self.assertEqual(self.protocol._decode_header(b"a\\tb\\"), "a\\tb\\")
+        self.assertEqual(self.protocol._decode_header("ç".encode()), "ç")
+
 
 class TestReadFrame(TestCase):
     def setUp(self):
@@ -401,3 +607,68 @@ class TestReadFrame(TestCase):
         self.assertEqual(frame.headers, {"accept-version": "1.0"})
         self.assertEqual(frame.body, None)
         self.assertEqual(str(frame), "<Frame: CONNECT headers: accept-version: 1.0>")
+
+
+class TestLazyHeaders(TestCase):
+    def setUp(self):
+        self.protocol = StompProtocol(lazy_headers=True)
+
+    def test_headers_are_decoded_on_access(self):
+        self.protocol.feed_data(
+            b"MESSAGE\n"
+            b"subscription:1\n"
+            b"message-id:ID\\c1\\c2\n"
+            b"content-length:4\n"
+            b"destination:/queue/test\n\n"
+            b"data\x00"
+        )
+
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(frames[0].command, "MESSAGE")
+        self.assertEqual(frames[0].body, b"data")
+
+        headers = frames[0].headers
+        self.assertEqual(set(headers._decoded), {"content-length"})
+
+        self.assertEqual(headers["message-id"], "ID:1:2")
+        self.assertEqual(headers.get("subscription"), "1")
+        self.assertEqual(set(headers._decoded), {"content-length", "message-id", "subscription"})
+
+        self.assertIn("destination", headers)
+        self.assertNotIn("message", headers)
+        self.assertIsNone(headers.get("message"))
+        with self.assertRaises(KeyError):
+            headers["message"]
+
+    def test_headers_compare_as_a_mapping(self):
+        self.protocol.feed_data(b"CONNECTED\r\n" b"version:1.1\r\n" b"heart-beat:0,0\r\n\r\n\x00")
+
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual(frames[0].command, "CONNECTED")
+        self.assertEqual(frames[0].headers["version"], "1.1")
+        self.assertEqual(frames[0].headers, {"version": "1.1", "heart-beat": "0,0"})
+        self.assertEqual(len(frames[0].headers), 2)
+        self.assertEqual(sorted(frames[0].headers), ["heart-beat", "version"])
+        self.assertEqual(
+            str(frames[0]), "<Frame: CONNECTED headers: version: 1.1;heart-beat: 0,0>"
+        )
+
+    def test_last_repeated_header_wins(self):
+        self.protocol.feed_data(b"MESSAGE\n" b"foo:1\n" b"foo:2\n\n\x00")
+
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual(frames[0].headers["foo"], "2")
+        self.assertEqual(dict(frames[0].headers), {"foo": "2"})
+
+    def test_frame_without_headers(self):
+        self.protocol.feed_data(b"RECEIPT\n\n\x00")
+
+        frames = self.protocol.pop_frames()
+
+        self.assertEqual(frames[0].command, "RECEIPT")
+        self.assertEqual(frames[0].headers, {})
+        self.assertNotIn("receipt-id", frames[0].headers)
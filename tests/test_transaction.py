@@ -0,0 +1,188 @@
+import asyncio
+
+from asynctest import CoroutineMock, Mock
+
+from aiostomp.test_utils import AsyncTestCase, unittest_run_loop
+from aiostomp.errors import StompError
+from aiostomp.transaction import Transaction, BatchingPublisher
+
+
+class TestTransaction(AsyncTestCase):
+    async def setUpAsync(self):
+        self.client = Mock()
+        self.commit_future = self.loop.create_future()
+        self.client.commit.return_value = self.commit_future
+
+    @unittest_run_loop
+    async def test_commits_on_exit(self):
+        self.commit_future.set_result(None)
+
+        async with Transaction(self.client, "tx-1") as tx:
+            tx.send("/queue/test", "1", headers={"my-header": "my-value"})
+            tx.send("/queue/test", "2")
+
+        self.client.begin.assert_called_once_with("tx-1")
+        self.assertEqual(
+            self.client.send.call_args_list,
+            [
+                (("/queue/test", "1", {"my-header": "my-value", "transaction": "tx-1"}, True),),
+                (("/queue/test", "2", {"transaction": "tx-1"}, True),),
+            ],
+        )
+        self.client.commit.assert_called_once_with("tx-1", receipt=True)
+        self.client.abort.assert_not_called()
+        self.assertEqual(tx.messages, 2)
+
+    @unittest_run_loop
+    async def test_acks_in_transaction(self):
+        frame = Mock()
+
+        async with Transaction(self.client, "tx-1", receipt=False) as tx:
+            self.assertTrue(tx.open)
+            tx.ack(frame)
+            tx.nack(frame)
+
+        self.assertFalse(tx.open)
+        self.client.ack.assert_called_once_with(frame, transaction="tx-1")
+        self.client.nack.assert_called_once_with(frame, transaction="tx-1")
+
+        with self.assertRaises(RuntimeError):
+            tx.ack(frame)
+
+    @unittest_run_loop
+    async def test_commit_waits_for_receipt(self):
+        tx = Transaction(self.client, "tx-1")
+        tx.begin()
+
+        commit = self.loop.create_task(tx.commit())
+        await asyncio.sleep(0)
+        self.assertFalse(commit.done())
+
+        self.commit_future.set_result(None)
+        await commit
+
+    @unittest_run_loop
+    async def test_commit_without_receipt(self):
+        self.client.commit.return_value = None
+
+        tx = Transaction(self.client, "tx-1", receipt=False)
+        tx.begin()
+        await tx.commit()
+
+        self.client.commit.assert_called_once_with("tx-1", receipt=False)
+
+    @unittest_run_loop
+    async def test_aborts_when_block_raises(self):
+        with self.assertRaises(ValueError):
+            async with Transaction(self.client, "tx-1") as tx:
+                tx.send("/queue/test", "1")
+                raise ValueError()
+
+        self.client.abort.assert_called_once_with("tx-1")
+        self.client.commit.assert_not_called()
+
+    @unittest_run_loop
+    async def test_cannot_use_finished_transaction(self):
+        tx = Transaction(self.client, "tx-1")
+
+        with self.assertRaises(RuntimeError):
+            tx.send("/queue/test", "1")
+
+        tx.begin()
+        with self.assertRaises(RuntimeError):
+            tx.begin()
+
+        tx.abort()
+        with self.assertRaises(RuntimeError):
+            tx.send("/queue/test", "1")
+
+        with self.assertRaises(RuntimeError):
+            await tx.commit()
+
+    @unittest_run_loop
+    async def test_can_finish_inside_block(self):
+        async with Transaction(self.client, "tx-1") as tx:
+            tx.abort()
+
+        self.client.commit.assert_not_called()
+
+
+class TestBatchingPublisher(AsyncTestCase):
+    async def setUpAsync(self):
+        self.transactions = []
+        self.client = Mock()
+        self.client.drain = CoroutineMock()
+
+        def transaction(receipt):
+            tx = Mock(messages=0)
+            tx.commit = CoroutineMock()
+
+            def send(*args):
+                tx.messages += 1
+
+            tx.send.side_effect = send
+            self.transactions.append(tx)
+            return tx
+
+        self.client.transaction.side_effect = transaction
+
+    def test_max_messages_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            BatchingPublisher(self.client, max_messages=0)
+
+    @unittest_run_loop
+    async def test_commits_every_max_messages(self):
+        publisher = BatchingPublisher(self.client, max_messages=2, max_wait_ms=1000)
+
+        for n in range(5):
+            await publisher.send("/queue/test", str(n))
+
+        self.assertEqual(len(self.transactions), 3)
+        self.transactions[0].commit.assert_called_once()
+        self.transactions[1].commit.assert_called_once()
+        self.transactions[2].commit.assert_not_called()
+
+        self.assertEqual(publisher.pending, 1)
+        self.assertEqual(publisher.committed, 4)
+        self.assertEqual(self.client.drain.call_count, 5)
+
+    @unittest_run_loop
+    async def test_commits_after_max_wait(self):
+        publisher = BatchingPublisher(self.client, max_messages=100, max_wait_ms=5)
+
+        await publisher.send("/queue/test", "1")
+        self.transactions[0].commit.assert_not_called()
+
+        await asyncio.sleep(0.02)
+
+        self.transactions[0].commit.assert_called_once()
+        self.assertEqual(publisher.pending, 0)
+        self.assertEqual(publisher.committed, 1)
+
+    @unittest_run_loop
+    async def test_flush_commits_pending_messages(self):
+        publisher = BatchingPublisher(self.client, max_messages=100, max_wait_ms=1000)
+
+        await publisher.send("/queue/test", "1")
+        await publisher.flush()
+
+        self.transactions[0].commit.assert_called_once()
+        self.assertIsNone(publisher._timer)
+
+        # Nothing left to commit
+        await publisher.flush()
+        self.assertEqual(len(self.transactions), 1)
+
+    @unittest_run_loop
+    async def test_timer_commit_errors_are_raised_later(self):
+        publisher = BatchingPublisher(self.client, max_messages=100, max_wait_ms=1)
+
+        await publisher.send("/queue/test", "1")
+        self.transactions[0].commit.side_effect = StompError("denied", None)
+
+        await asyncio.sleep(0.02)
+
+        with self.assertRaises(StompError):
+            await publisher.send("/queue/test", "2")
+
+        await publisher.flush()